@@ -1,18 +1,45 @@
 """Dashboard router - aggregated statistics endpoint."""
 
-from datetime import datetime, timedelta
-from typing import Annotated
-
+import asyncio
+import logging
 import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, case, func, select
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Integer,
+    Interval,
+    Row,
+    Select,
+    and_,
+    bindparam,
+    func,
+    literal_column,
+    select,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.cache import invalidate_on_commit
+from app.core.database import STRICT_LOADING, AsyncSessionLocal, engine, get_db
 from app.core.deps import CurrentUser
-from app.models import Part, Receiving, Outgoing, Request, PartMovement
+from app.models import (
+    Outgoing,
+    OutgoingItem,
+    Part,
+    PartMovement,
+    Receiving,
+    ReceivingItem,
+    Request,
+    RequestList,
+)
 from app.schemas import (
     DashboardResponse,
     DashboardStats,
@@ -21,27 +48,167 @@ from app.schemas import (
     OutgoingsStats,
     RequestsStats,
     PartResponse,
-    ReceivingResponse,
-    OutgoingResponse,
+    ReceivingSummaryResponse,
+    OutgoingSummaryResponse,
     RequestResponse,
-    PartMovementResponse,
+    RecentMovementResponse,
 )
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-_DASHBOARD_CACHE_TTL_SECONDS = 10.0
-_dashboard_cache: dict[int, tuple[float, DashboardResponse]] = {}
+logger = logging.getLogger(__name__)
+
+# Fresh for 10s, then served stale for up to 30s more while a background refresh runs
+_DASHBOARD_CACHE_TTL_NS = 10 * 1_000_000_000
+_DASHBOARD_CACHE_STALE_NS = 30 * 1_000_000_000
+_MOVEMENTS_CACHE_MAXSIZE = 8
+
+# Only recent_movements depends on `days`. Cache keys are None for the shared
+# section (stats + recent lists) and `days` for the movements section; each
+# entry is (fresh_until_ns, stale_until_ns, serialized JSON fragment).
+CacheEntry = tuple[int, int, bytes]
+_shared_cache: CacheEntry | None = None
+_movements_cache: OrderedDict[int, CacheEntry] = OrderedDict()
+_dashboard_locks: dict[int | None, asyncio.Lock] = {}
+_dashboard_refreshing: set[int | None] = set()
+_background_tasks: set[asyncio.Task[None]] = set()
+# Bumped on every invalidation so a build that started before a write never
+# stores its (now outdated) result
+_cache_generation = 0
+
+# Committing changes to any of these drops the cached dashboard in this worker
+_DASHBOARD_MODELS = (
+    Part,
+    PartMovement,
+    Receiving,
+    ReceivingItem,
+    Outgoing,
+    OutgoingItem,
+    Request,
+    RequestList,
+)
 
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
+_ReceivingSummaryListAdapter = TypeAdapter(list[ReceivingSummaryResponse])
+_OutgoingSummaryListAdapter = TypeAdapter(list[OutgoingSummaryResponse])
+_PartListAdapter = TypeAdapter(list[PartResponse])
+_RequestListAdapter = TypeAdapter(list[RequestResponse])
+_RecentMovementListAdapter = TypeAdapter(list[RecentMovementResponse])
+
+# Every per-entity stats row is padded to the same width so they can be UNION ALL'd
+_STATS_COLUMNS = 5
+
+
+def _count_if(condition: ColumnElement[bool]) -> ColumnElement[int]:
+    """Conditional counter: COUNT(*) FILTER (WHERE condition), never NULL."""
+    return func.count().filter(condition)
+
+
+def _stats_select(entity: str, *counters: ColumnElement[int]) -> Select[Any]:
+    """Build one fixed-width stats row tagged with its entity name."""
+    padded = list(counters) + [literal_column("0")] * (_STATS_COLUMNS - len(counters))
+    return select(
+        literal_column(f"'{entity}'").label("entity"),
+        *(counter.label(f"c{i}") for i, counter in enumerate(padded)),
+    )
+
+
+_STATS_STMT = union_all(
+    _stats_select(
+        "parts",
+        func.count(Part.id),
+        _count_if(Part.is_active.is_(True)),
+        _count_if(Part.stock_status == "in_stock"),
+        _count_if(Part.stock_status == "low_stock"),
+        _count_if(Part.stock_status == "out_of_stock"),
+    ).where(Part.deleted_at.is_(None)),
+    _stats_select(
+        "receivings",
+        func.count(Receiving.id),
+        _count_if(Receiving.status == "draft"),
+        _count_if(Receiving.status == "completed"),
+        _count_if(and_(Receiving.status == "completed", Receiving.is_gr.is_(False))),
+    ).where(Receiving.deleted_at.is_(None)),
+    _stats_select(
+        "outgoings",
+        func.count(Outgoing.id),
+        _count_if(Outgoing.status == "draft"),
+        _count_if(Outgoing.status == "completed"),
+        _count_if(and_(Outgoing.status == "completed", Outgoing.is_gi.is_(False))),
+    ).where(Outgoing.deleted_at.is_(None)),
+    _stats_select(
+        "requests",
+        func.count(Request.id),
+        _count_if(Request.status == "draft"),
+        _count_if(Request.status == "completed"),
+    ).where(Request.deleted_at.is_(None)),
+)
+
+
+# Recent-item queries are built once at import time. A prebuilt statement
+# memoizes its cache key, so repeat executions go straight to the compiled-SQL
+# cache; the per-request day window is a bind parameter, not a rebuild.
+# Receivings/outgoings are summary rows: the total_items hybrid sums in SQL instead of
+# loading every line item.
+_RECENT_RECEIVINGS_STMT = (
+    select(Receiving.__table__, Receiving.total_items.label("total_items"))
+    .where(Receiving.deleted_at.is_(None))
+    .order_by(Receiving.created_at.desc())
+    .limit(5)
+)
+
+_RECENT_OUTGOINGS_STMT = (
+    select(Outgoing.__table__, Outgoing.total_items.label("total_items"))
+    .where(Outgoing.deleted_at.is_(None))
+    .order_by(Outgoing.created_at.desc())
+    .limit(5)
+)
+
+_LOW_STOCK_PARTS_STMT = (
+    select(Part)
+    .options(*STRICT_LOADING)
+    .where(and_(Part.deleted_at.is_(None), Part.stock_status == "low_stock"))
+    .order_by(Part.stock.asc())
+    .limit(10)
+)
 
-@router.get("", response_model=DashboardResponse)
+_PENDING_REQUESTS_STMT = (
+    select(Request)
+    .where(and_(Request.deleted_at.is_(None), Request.status == "draft"))
+    # Strict loading also covers the eager-loaded children, whose own
+    # relationships must never be touched while rendering
+    .options(
+        selectinload(Request.items).options(*STRICT_LOADING),
+        selectinload(Request.requested_by_user).options(*STRICT_LOADING),
+        *STRICT_LOADING,
+    )
+    .order_by(Request.created_at.desc())
+    .limit(5)
+)
+
+# Recent movements (last N days, up to 100) as plain rows with the part's number
+# and name joined in. The cutoff is computed by Postgres in naive Jakarta time,
+# matching how created_at is stored, so only the day count is sent.
+_RECENT_MOVEMENTS_STMT = (
+    select(PartMovement.__table__, Part.part_number, Part.part_name)
+    .join(Part, Part.id == PartMovement.part_id)
+    .where(
+        PartMovement.created_at
+        >= literal_column("(now() AT TIME ZONE 'Asia/Jakarta')", DateTime)
+        - literal_column("interval '1 day'", Interval) * bindparam("days", type_=Integer)
+    )
+    .order_by(PartMovement.created_at.desc())
+    .limit(100)
+)
+
+@router.get("", response_model=DashboardResponse, response_class=ORJSONResponse)
 async def get_dashboard(
     db: DB,
     current_user: CurrentUser,
     days: int = Query(default=30, ge=1, le=365, description="Number of days for recent movements"),
-) -> DashboardResponse:
+) -> Response:
     """
     Get aggregated dashboard statistics.
     
@@ -54,212 +221,231 @@ async def get_dashboard(
     - Recent receivings, outgoings (last 5)
     - Low stock parts (up to 10)
     - Pending requests (up to 5)
+    
+    The days-independent section is cached once and recent movements are
+    cached per `days` (LRU of 8), both as pre-serialized JSON. Within the
+    stale window a cached section is served immediately while a background
+    task refreshes it. Committing inventory changes drops the cache.
     """
-    cached = _dashboard_cache.get(days)
-    now = time.monotonic()
+    # The shared section runs on its own sessions, so both can build concurrently
+    shared, movements = await asyncio.gather(_get_section(db, None), _get_section(db, days))
+    # shared is a JSON object; splice recent_movements in as its last field
+    body = shared[:-1] + b',"recent_movements":' + movements + b"}"
+    # Already encoded as JSON; a plain Response skips response_model and re-rendering
+    return Response(content=body, media_type=ORJSONResponse.media_type)
+
+
+async def _get_section(db: AsyncSession, key: int | None) -> bytes:
+    """Return a cached section, serving stale while refreshing, or build it once under a lock."""
+    now_ns = time.monotonic_ns()
+    cached = _lookup(key)
     if cached is not None:
-        cached_at, cached_value = cached
-        if now - cached_at <= _DASHBOARD_CACHE_TTL_SECONDS:
-            return cached_value
+        fresh_until_ns, stale_until_ns, cached_body = cached
+        if now_ns < fresh_until_ns:
+            return cached_body
+        if now_ns < stale_until_ns:
+            _schedule_refresh(key)
+            return cached_body
 
-    # Calculate date range for movements
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # =========================================================================
-    # PARTS STATISTICS (using SQL aggregation for accuracy)
-    # =========================================================================
-    parts_stats_row = (
-        await db.execute(
-            select(
-                func.count(Part.id),
-                func.coalesce(func.sum(case((Part.is_active.is_(True), 1), else_=0)), 0),
-                func.coalesce(func.sum(case((Part.stock > 10, 1), else_=0)), 0),
-                func.coalesce(
-                    func.sum(case((and_(Part.stock > 0, Part.stock <= 10), 1), else_=0)), 0
-                ),
-                func.coalesce(func.sum(case((Part.stock <= 0, 1), else_=0)), 0),
-            ).where(Part.deleted_at.is_(None))
-        )
-    ).one()
-    total_parts, active_parts, in_stock_count, low_stock_count, out_of_stock_count = (
-        int(parts_stats_row[0] or 0),
-        int(parts_stats_row[1] or 0),
-        int(parts_stats_row[2] or 0),
-        int(parts_stats_row[3] or 0),
-        int(parts_stats_row[4] or 0),
-    )
-    
-    # =========================================================================
-    # RECEIVINGS STATISTICS
-    # =========================================================================
-    receivings_stats_row = (
-        await db.execute(
-            select(
-                func.count(Receiving.id),
-                func.coalesce(func.sum(case((Receiving.status == "draft", 1), else_=0)), 0),
-                func.coalesce(func.sum(case((Receiving.status == "completed", 1), else_=0)), 0),
-                func.coalesce(
-                    func.sum(
-                        case(
-                            (
-                                and_(Receiving.status == "completed", Receiving.is_gr.is_(False)),
-                                1,
-                            ),
-                            else_=0,
-                        )
-                    ),
-                    0,
-                ),
-            ).where(Receiving.deleted_at.is_(None))
-        )
-    ).one()
-    total_receivings, draft_receivings, completed_receivings, pending_gr_count = (
-        int(receivings_stats_row[0] or 0),
-        int(receivings_stats_row[1] or 0),
-        int(receivings_stats_row[2] or 0),
-        int(receivings_stats_row[3] or 0),
-    )
-    
-    # =========================================================================
-    # OUTGOINGS STATISTICS
-    # =========================================================================
-    outgoings_stats_row = (
-        await db.execute(
-            select(
-                func.count(Outgoing.id),
-                func.coalesce(func.sum(case((Outgoing.status == "draft", 1), else_=0)), 0),
-                func.coalesce(func.sum(case((Outgoing.status == "completed", 1), else_=0)), 0),
-                func.coalesce(
-                    func.sum(
-                        case(
-                            (
-                                and_(Outgoing.status == "completed", Outgoing.is_gi.is_(False)),
-                                1,
-                            ),
-                            else_=0,
-                        )
-                    ),
-                    0,
-                ),
-            ).where(Outgoing.deleted_at.is_(None))
-        )
-    ).one()
-    total_outgoings, draft_outgoings, completed_outgoings, pending_gi_count = (
-        int(outgoings_stats_row[0] or 0),
-        int(outgoings_stats_row[1] or 0),
-        int(outgoings_stats_row[2] or 0),
-        int(outgoings_stats_row[3] or 0),
-    )
-    
-    # =========================================================================
-    # REQUESTS STATISTICS
-    # =========================================================================
-    requests_stats_row = (
-        await db.execute(
-            select(
-                func.count(Request.id),
-                func.coalesce(func.sum(case((Request.status == "draft", 1), else_=0)), 0),
-                func.coalesce(func.sum(case((Request.status == "completed", 1), else_=0)), 0),
-            ).where(Request.deleted_at.is_(None))
-        )
-    ).one()
-    total_requests, draft_requests, completed_requests = (
-        int(requests_stats_row[0] or 0),
-        int(requests_stats_row[1] or 0),
-        int(requests_stats_row[2] or 0),
+    # Cold or fully expired: only one coroutine recomputes, the rest wait for it
+    async with _get_lock(key):
+        cached = _lookup(key)
+        if cached is not None and time.monotonic_ns() < cached[0]:
+            return cached[2]
+        generation = _cache_generation
+        body = await _build_section(db, key)
+        _store(key, body, generation)
+    return body
+
+
+def _lookup(key: int | None) -> CacheEntry | None:
+    """Get a cache entry, marking a movements entry as recently used."""
+    if key is None:
+        return _shared_cache
+    cached = _movements_cache.get(key)
+    if cached is not None:
+        _movements_cache.move_to_end(key)
+    return cached
+
+
+def _get_lock(key: int | None) -> asyncio.Lock:
+    """Get (or create) the recompute lock for a cache key."""
+    lock = _dashboard_locks.get(key)
+    if lock is None:
+        lock = _dashboard_locks[key] = asyncio.Lock()
+    return lock
+
+
+def _store(key: int | None, body: bytes, generation: int) -> None:
+    """Cache a freshly built section with its fresh and stale deadlines."""
+    global _shared_cache
+    if generation != _cache_generation:
+        return
+    now_ns = time.monotonic_ns()
+    fresh_until_ns = now_ns + _DASHBOARD_CACHE_TTL_NS
+    entry = (fresh_until_ns, fresh_until_ns + _DASHBOARD_CACHE_STALE_NS, body)
+    if key is None:
+        _shared_cache = entry
+        return
+    _movements_cache[key] = entry
+    _movements_cache.move_to_end(key)
+    while len(_movements_cache) > _MOVEMENTS_CACHE_MAXSIZE:
+        _movements_cache.popitem(last=False)
+
+
+def invalidate_dashboard_cache() -> None:
+    """Drop every cached dashboard section so the next request rebuilds it."""
+    global _shared_cache, _cache_generation
+    _cache_generation += 1
+    _shared_cache = None
+    _movements_cache.clear()
+
+
+invalidate_on_commit(_DASHBOARD_MODELS, invalidate_dashboard_cache, "dashboard_dirty")
+
+
+def _schedule_refresh(key: int | None) -> None:
+    """Start a background refresh for a stale cache key unless one is already running."""
+    if key in _dashboard_refreshing:
+        return
+    _dashboard_refreshing.add(key)
+    task = asyncio.create_task(_refresh(key))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _refresh(key: int | None) -> None:
+    """Rebuild a cached section on its own session (the request session is gone by now)."""
+    try:
+        async with _get_lock(key):
+            generation = _cache_generation
+            async with AsyncSessionLocal() as session:
+                body = await _build_section(session, key)
+            _store(key, body, generation)
+    except Exception:
+        logger.exception("Background dashboard refresh failed (days=%s)", key)
+    finally:
+        _dashboard_refreshing.discard(key)
+
+
+async def _build_section(db: AsyncSession, key: int | None) -> bytes:
+    """Build the section for a cache key."""
+    if key is None:
+        return await _build_shared()
+    return await _build_movements(db, key)
+
+
+async def _fetch(stmt: Any) -> Sequence[Any]:
+    """Run one read-only ORM query on its own short-lived session."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+
+async def _fetch_rows(stmt: Any) -> Sequence[Row[Any]]:
+    """Run one read-only Core query on its own pooled connection (no Session overhead)."""
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        return result.all()
+
+
+async def _build_shared() -> bytes:
+    """Run the days-independent queries and return them as a serialized JSON object."""
+    # A connection runs one query at a time, so each query gets its own
+    # connection from the pool and the five round-trips overlap instead of
+    # queueing. Plain row queries skip the ORM Session entirely.
+    stats_result, recent_receivings, recent_outgoings, low_stock_parts, pending_requests = await asyncio.gather(
+        _fetch_rows(_STATS_STMT),
+        _fetch_rows(_RECENT_RECEIVINGS_STMT),  # last 5, summary rows
+        _fetch_rows(_RECENT_OUTGOINGS_STMT),  # last 5, summary rows
+        _fetch(_LOW_STOCK_PARTS_STMT),  # up to 10
+        _fetch(_PENDING_REQUESTS_STMT),  # draft status, up to 5
     )
-    
+
     # =========================================================================
-    # FETCH RECENT ITEMS
+    # STATISTICS (all four aggregates in a single round-trip)
     # =========================================================================
-    
-    # Recent receivings (last 5)
-    recent_receivings_result = await db.execute(
-        select(Receiving)
-        .where(Receiving.deleted_at.is_(None))
-        .options(selectinload(Receiving.items))
-        .order_by(Receiving.created_at.desc())
-        .limit(5)
-    )
-    recent_receivings = recent_receivings_result.scalars().all()
-    
-    # Recent outgoings (last 5)
-    recent_outgoings_result = await db.execute(
-        select(Outgoing)
-        .where(Outgoing.deleted_at.is_(None))
-        .options(selectinload(Outgoing.items))
-        .order_by(Outgoing.created_at.desc())
-        .limit(5)
-    )
-    recent_outgoings = recent_outgoings_result.scalars().all()
-    
-    # Low stock parts (up to 10)
-    low_stock_parts_result = await db.execute(
-        select(Part)
-        .where(and_(Part.deleted_at.is_(None), Part.stock > 0, Part.stock <= 10))
-        .order_by(Part.stock.asc())
-        .limit(10)
-    )
-    low_stock_parts = low_stock_parts_result.scalars().all()
-    
-    # Pending requests (draft status, up to 5)
-    pending_requests_result = await db.execute(
-        select(Request)
-        .where(and_(Request.deleted_at.is_(None), Request.status == "draft"))
-        .options(selectinload(Request.items), selectinload(Request.requested_by_user))
-        .order_by(Request.created_at.desc())
-        .limit(5)
-    )
-    pending_requests = pending_requests_result.scalars().all()
-    
-    # Recent movements (last N days, up to 100)
-    recent_movements_result = await db.execute(
-        select(PartMovement)
-        .where(PartMovement.created_at >= start_date)
-        .order_by(PartMovement.created_at.desc())
-        .limit(100)
-    )
-    recent_movements = recent_movements_result.scalars().all()
+    # One row per entity; COUNT never returns NULL, so columns map straight
+    # onto the stats models (unused padding columns are ignored)
+    stats_rows = {row.entity: row for row in stats_result}
+    parts_row = stats_rows["parts"]
+    receivings_row = stats_rows["receivings"]
+    outgoings_row = stats_rows["outgoings"]
+    requests_row = stats_rows["requests"]
     
     # =========================================================================
     # BUILD RESPONSE
     # =========================================================================
     stats = DashboardStats(
         parts=PartsStats(
-            total=total_parts,
-            active=active_parts,
-            in_stock=in_stock_count,
-            low_stock=low_stock_count,
-            out_of_stock=out_of_stock_count,
+            total=parts_row.c0,
+            active=parts_row.c1,
+            in_stock=parts_row.c2,
+            low_stock=parts_row.c3,
+            out_of_stock=parts_row.c4,
         ),
         receivings=ReceivingsStats(
-            total=total_receivings,
-            draft=draft_receivings,
-            completed=completed_receivings,
-            pending_gr=pending_gr_count,
+            total=receivings_row.c0,
+            draft=receivings_row.c1,
+            completed=receivings_row.c2,
+            pending_gr=receivings_row.c3,
         ),
         outgoings=OutgoingsStats(
-            total=total_outgoings,
-            draft=draft_outgoings,
-            completed=completed_outgoings,
-            pending_gi=pending_gi_count,
+            total=outgoings_row.c0,
+            draft=outgoings_row.c1,
+            completed=outgoings_row.c2,
+            pending_gi=outgoings_row.c3,
         ),
         requests=RequestsStats(
-            total=total_requests,
-            draft=draft_requests,
-            completed=completed_requests,
+            total=requests_row.c0,
+            draft=requests_row.c1,
+            completed=requests_row.c2,
         ),
     )
     
-    response = DashboardResponse(
-        stats=stats,
-        recent_receivings=[ReceivingResponse.model_validate(r) for r in recent_receivings],
-        recent_outgoings=[OutgoingResponse.model_validate(o) for o in recent_outgoings],
-        low_stock_parts=[PartResponse.model_validate(p) for p in low_stock_parts],
-        pending_requests=[RequestResponse.model_validate(r) for r in pending_requests],
-        recent_movements=[PartMovementResponse.model_validate(m) for m in recent_movements],
+    # Validation and encoding is pure CPU work; keep it off the event loop
+    return await asyncio.to_thread(
+        _render_shared,
+        stats,
+        recent_receivings,
+        recent_outgoings,
+        low_stock_parts,
+        pending_requests,
     )
 
-    _dashboard_cache[days] = (now, response)
-    return response
+
+async def _build_movements(db: AsyncSession, days: int) -> bytes:
+    """Fetch movements from the last `days` days and return them as a serialized JSON array."""
+    recent_movements_result = await db.execute(_RECENT_MOVEMENTS_STMT, {"days": days})
+    recent_movements = recent_movements_result.all()
+    return await asyncio.to_thread(_render_movements, recent_movements)
+
+
+def _render_shared(
+    stats: DashboardStats,
+    recent_receivings: Sequence[Row[Any]],
+    recent_outgoings: Sequence[Row[Any]],
+    low_stock_parts: Sequence[Part],
+    pending_requests: Sequence[Request],
+) -> bytes:
+    """Validate the days-independent rows and encode them as a JSON object (runs in a worker thread)."""
+    return b"".join((
+        b'{"stats":', stats.model_dump_json().encode(),
+        b',"recent_receivings":', _dump_json(_ReceivingSummaryListAdapter, recent_receivings),
+        b',"recent_outgoings":', _dump_json(_OutgoingSummaryListAdapter, recent_outgoings),
+        b',"low_stock_parts":', _dump_json(_PartListAdapter, low_stock_parts),
+        b',"pending_requests":', _dump_json(_RequestListAdapter, pending_requests),
+        b"}",
+    ))
+
+
+def _render_movements(recent_movements: Sequence[Row[Any]]) -> bytes:
+    """Validate movements and encode them as a JSON array (runs in a worker thread)."""
+    return _dump_json(_RecentMovementListAdapter, recent_movements)
+
+
+def _dump_json(adapter: TypeAdapter[Any], rows: Sequence[Any]) -> bytes:
+    """Validate ORM rows through a list adapter and serialize them straight to JSON bytes."""
+    # pydantic-core writes the JSON itself, skipping the intermediate dicts an
+    # orjson pass would need
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
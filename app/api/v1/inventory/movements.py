@@ -1,15 +1,17 @@
 """Movements router - API endpoints for stock movements."""
 
-from datetime import date, datetime
+from datetime import date, timedelta
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import Date, func, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import STRICT_LOADING, estimate_row_count, get_db
 from app.core.deps import CurrentUser
+from app.core.pagination import decode_cursor, encode_cursor, fetch_page_with_total, page_response
 from app.models import PartMovement
 from app.schemas import (
     MovementType,
@@ -23,8 +25,11 @@ router = APIRouter(prefix="/movements", tags=["movements"])
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
+_PartMovementListAdapter = TypeAdapter(list[PartMovementResponse])
+_PartMovementPage = PaginatedResponse[PartMovementResponse]
 
-@router.get("", response_model=PaginatedResponse[PartMovementResponse])
+
+@router.get("", response_model=_PartMovementPage)
 async def get_movements(
     db: DB,
     current_user: CurrentUser,
@@ -35,7 +40,9 @@ async def get_movements(
     reference_type: ReferenceType | None = Query(default=None, description="Filter by reference type"),
     start_date: date | None = Query(default=None, description="Filter by start date (YYYY-MM-DD)"),
     end_date: date | None = Query(default=None, description="Filter by end date (YYYY-MM-DD)"),
-) -> PaginatedResponse[PartMovementResponse]:
+    cursor: str | None = Query(default=None, description="Keyset cursor from a previous page's next_cursor"),
+    exact_count: bool = Query(default=False, description="Return an exact total (also enables total in cursor mode)"),
+) -> Response:
     """
     Get all movements with optional filters and pagination.
     
@@ -44,6 +51,9 @@ async def get_movements(
     - **reference_type**: Filter by source document type ('Receivings' or 'Outgoings')
     - **start_date**: Only include movements on or after this date (strict YYYY-MM-DD format)
     - **end_date**: Only include movements on or before this date (strict YYYY-MM-DD format)
+    - **cursor**: Seek past the last row of the previous page instead of using `page` (no OFFSET scan)
+    - **exact_count**: Without filters, `total` is the planner's row estimate unless this is true;
+      in cursor mode `total` is only computed when this is true
     """
     filters = []
     
@@ -57,33 +67,49 @@ async def get_movements(
     if reference_type:
         filters.append(PartMovement.reference_type == reference_type.value)
     
+    # Half-open [start_date, end_date + 1 day) range; dates are bound as DATE and
+    # promoted to midnight by Postgres, so no microsecond end-of-day boundary
     if start_date:
-        start_dt = datetime.combine(start_date, datetime.min.time())
-        filters.append(PartMovement.created_at >= start_dt)
+        filters.append(PartMovement.created_at >= literal(start_date, Date))
     
     if end_date:
-        end_dt = datetime.combine(end_date, datetime.max.time())
-        filters.append(PartMovement.created_at <= end_dt)
+        filters.append(PartMovement.created_at < literal(end_date + timedelta(days=1), Date))
     
-    # Count total
-    count_stmt = select(func.count()).select_from(PartMovement)
+    # Shared filtered base for both the count and the page
+    base = select(PartMovement)
     if filters:
-        count_stmt = count_stmt.where(*filters)
-    total = int((await db.execute(count_stmt)).scalar() or 0)
+        base = base.where(*filters)
     
-    # Order by most recent first and paginate
-    offset = (page - 1) * limit
-    stmt = select(PartMovement)
-    if filters:
-        stmt = stmt.where(*filters)
-    stmt = stmt.order_by(PartMovement.created_at.desc()).offset(offset).limit(limit)
+    count_stmt = base.with_only_columns(func.count(PartMovement.id)).order_by(None)
     
-    result = await db.execute(stmt)
-    movements = result.scalars().all()
+    # Order by most recent first; seek past the cursor (exact total only on
+    # request), use the planner estimate for the unfiltered table, or fall back
+    # to offset paging with the total counted on the same scan
+    stmt = (
+        base.options(*STRICT_LOADING)
+        .order_by(PartMovement.created_at.desc(), PartMovement.id.desc())
+        .limit(limit)
+    )
+    offset = (page - 1) * limit
+    total: int | None = None
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(PartMovement.created_at, PartMovement.id) < tuple_(cursor_created_at, cursor_id))
+        movements = (await db.execute(stmt)).scalars().all()
+        if exact_count:
+            total = (await db.execute(count_stmt)).scalar_one()
+    elif not filters and not exact_count and (
+        total := await estimate_row_count(db, PartMovement.__tablename__)
+    ) is not None:
+        movements = (await db.execute(stmt.offset(offset))).scalars().all()
+    else:
+        movements, total = await fetch_page_with_total(db, stmt, count_stmt, offset)
+    next_cursor = encode_cursor(movements[-1].created_at, movements[-1].id) if len(movements) == limit else None
     
-    return PaginatedResponse[PartMovementResponse](
-        items=[PartMovementResponse.model_validate(m) for m in movements],
+    return page_response(_PartMovementPage(
+        items=_PartMovementListAdapter.validate_python(movements, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+        next_cursor=next_cursor,
+    ))
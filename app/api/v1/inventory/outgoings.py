@@ -1,21 +1,26 @@
 """Outgoing goods issue (Outgoing) management routes."""
 
-from datetime import datetime, timezone
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import Integer, and_, bindparam, column, func, insert, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.config import now_jakarta
+from app.core.database import STRICT_LOADING, get_db
 from app.core.deps import CurrentUser, require_permission
+from app.core.pagination import decode_cursor, encode_cursor, fetch_page_with_total, page_response
+from app.core.stock import chain_movement_rows
 from app.models import Outgoing, OutgoingItem, Part, PartMovement
 from app.schemas import (
     DocumentStatus,
     OutgoingCreate,
     OutgoingResponse,
+    OutgoingSummaryResponse,
     OutgoingUpdate,
     PaginatedResponse,
 )
@@ -25,8 +30,33 @@ router = APIRouter(prefix="/outgoings", tags=["outgoings"])
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
+_OutgoingListAdapter = TypeAdapter(list[OutgoingResponse])
+_OutgoingSummaryListAdapter = TypeAdapter(list[OutgoingSummaryResponse])
+_OutgoingPage = PaginatedResponse[OutgoingResponse | OutgoingSummaryResponse]
+
+# Summary rows sum item quantities in SQL instead of loading every line item
+_OUTGOING_SUMMARY_COLUMNS = (Outgoing.__table__, Outgoing.total_items.label("total_items"))
+
+# Point lookups built once; handlers only bind outgoing_id
+_OUTGOING_FILTER = and_(Outgoing.id == bindparam("outgoing_id"), Outgoing.deleted_at.is_(None))
+_OUTGOING_WITH_ITEMS_STMT = select(Outgoing).where(_OUTGOING_FILTER).options(selectinload(Outgoing.items))
+_OUTGOING_EXISTS_STMT = select(Outgoing.id).where(_OUTGOING_FILTER)
+_OUTGOING_STATUS_STMT = select(Outgoing.status).where(_OUTGOING_FILTER)
+
+# draft → completed as one guarded UPDATE; a concurrent or retried completion
+# waits on the row lock, then matches nothing once this one commits
+_COMPLETE_OUTGOING_STMT = (
+    update(Outgoing)
+    .where(and_(_OUTGOING_FILTER, Outgoing.status == DocumentStatus.DRAFT.value))
+    .values(status=DocumentStatus.COMPLETED.value)
+    .returning(Outgoing)
+    .options(selectinload(Outgoing.items))
+    # An outgoing already in the session takes the returned (completed) row
+    .execution_options(populate_existing=True)
+)
+
 
-@router.get("", response_model=PaginatedResponse[OutgoingResponse], dependencies=[Depends(require_permission("outgoings.view"))])
+@router.get("", response_model=_OutgoingPage, dependencies=[Depends(require_permission("outgoings.view"))])
 async def list_outgoings(
     db: DB,
     current_user: CurrentUser,
@@ -35,12 +65,17 @@ async def list_outgoings(
     status_filter: DocumentStatus | None = Query(default=None),
     pending_gi: bool = Query(default=False),
     doc_number: str | None = Query(default=None),
-) -> PaginatedResponse[OutgoingResponse]:
+    cursor: str | None = Query(default=None),
+    exact_count: bool = Query(default=False),
+    include_items: bool = Query(default=False),
+) -> Response:
     """
     List all outgoings with optional filtering and pagination.
     
     status_filter options: draft, completed, cancelled
     pending_gi=true to get outgoings awaiting GI confirmation
+    cursor=<next_cursor> for keyset pagination (total only with exact_count=true)
+    include_items=true to return full outgoings with line items instead of summaries
     """
     filters = [Outgoing.deleted_at.is_(None)]
 
@@ -53,29 +88,40 @@ async def list_outgoings(
     if doc_number:
         filters.append(Outgoing.doc_number.icontains(doc_number))
 
-    # Count total
-    count_stmt = select(func.count()).select_from(Outgoing).where(*filters)
-    total = int((await db.execute(count_stmt)).scalar() or 0)
-
-    # Fetch page with eager loading
-    offset = (page - 1) * limit
-    stmt = (
-        select(Outgoing)
-        .where(*filters)
-        .options(selectinload(Outgoing.items))
-        .order_by(Outgoing.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-    )
-    result = await db.execute(stmt)
-    outgoings = result.scalars().all()
+    # Shared filtered base for both the count and the page
+    base = select(Outgoing).where(*filters)
+    count_stmt = base.with_only_columns(func.count(Outgoing.id)).order_by(None)
+
+    # Fetch page (summary rows unless items are requested); seek past the cursor
+    # (total only on request) or fall back to offset paging with the total
+    # counted on the same scan
+    if include_items:
+        stmt = base.options(selectinload(Outgoing.items), *STRICT_LOADING)
+    else:
+        stmt = base.with_only_columns(*_OUTGOING_SUMMARY_COLUMNS)
+    stmt = stmt.order_by(Outgoing.created_at.desc(), Outgoing.id.desc()).limit(limit)
+    total: int | None = None
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Outgoing.created_at, Outgoing.id) < tuple_(cursor_created_at, cursor_id))
+        result = await db.execute(stmt)
+        outgoings = result.scalars().all() if include_items else result.all()
+        if exact_count:
+            total = (await db.execute(count_stmt)).scalar_one()
+    else:
+        outgoings, total = await fetch_page_with_total(
+            db, stmt, count_stmt, (page - 1) * limit, scalars=include_items
+        )
+    next_cursor = encode_cursor(outgoings[-1].created_at, outgoings[-1].id) if len(outgoings) == limit else None
 
-    return PaginatedResponse[OutgoingResponse](
-        items=[OutgoingResponse.model_validate(o) for o in outgoings],
+    adapter = _OutgoingListAdapter if include_items else _OutgoingSummaryListAdapter
+    return page_response(_OutgoingPage(
+        items=adapter.validate_python(outgoings, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+        next_cursor=next_cursor,
+    ))
 
 
 @router.get("/{outgoing_id}", response_model=OutgoingResponse, dependencies=[Depends(require_permission("outgoings.view"))])
@@ -85,12 +131,7 @@ async def get_outgoing(
     current_user: CurrentUser,
 ) -> OutgoingResponse:
     """Get outgoing with nested items."""
-    stmt = (
-        select(Outgoing)
-        .where(and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None)))
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(_OUTGOING_WITH_ITEMS_STMT, {"outgoing_id": outgoing_id})
     outgoing = result.scalar_one_or_none()
 
     if not outgoing:
@@ -123,15 +164,10 @@ async def create_outgoing(
 
     db.add(outgoing)
     await db.commit()
-    
-    # Reload with items relationship
-    stmt = (
-        select(Outgoing)
-        .where(Outgoing.id == outgoing.id)
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
-    return OutgoingResponse.model_validate(result.scalar_one())
+
+    # Ids, timestamps and items are all set in Python on flush, so neither
+    # RETURNING nor a reload is needed to build the response
+    return OutgoingResponse.model_validate(outgoing)
 
 
 @router.put("/{outgoing_id}", response_model=OutgoingResponse, dependencies=[Depends(require_permission("outgoings.update"))])
@@ -142,12 +178,7 @@ async def update_outgoing(
     current_user: CurrentUser,
 ) -> OutgoingResponse:
     """Update an outgoing (only if is_editable)."""
-    stmt = (
-        select(Outgoing)
-        .where(and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None)))
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(_OUTGOING_WITH_ITEMS_STMT, {"outgoing_id": outgoing_id})
     outgoing = result.scalar_one_or_none()
 
     if not outgoing:
@@ -175,14 +206,7 @@ async def update_outgoing(
             outgoing.items.append(item)
 
     await db.commit()
-    
-    stmt = (
-        select(Outgoing)
-        .where(Outgoing.id == outgoing.id)
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
-    return OutgoingResponse.model_validate(result.scalar_one())
+    return OutgoingResponse.model_validate(outgoing)
 
 
 @router.delete("/{outgoing_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_permission("outgoings.delete"))])
@@ -192,21 +216,63 @@ async def delete_outgoing(
     current_user: CurrentUser,
 ) -> None:
     """Soft-delete an outgoing."""
-    stmt = select(Outgoing).where(
-        and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None))
+    result = await db.execute(
+        update(Outgoing)
+        .where(and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None)))
+        .values(deleted_at=now_jakarta())
+        .returning(Outgoing.id)
     )
-    result = await db.execute(stmt)
-    outgoing = result.scalar_one_or_none()
 
-    if not outgoing:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Outgoing not found"
         )
 
-    outgoing.deleted_at = datetime.now(timezone.utc)
     await db.commit()
 
 
+async def _issue_stock(db: AsyncSession, outgoing: Outgoing) -> None:
+    """Decrement stock for every line item and record the out movements, or raise 409."""
+    if not outgoing.items:
+        return
+
+    # Total quantity per part, in line-item order (a part may repeat)
+    needed: dict[UUID, int] = {}
+    for item in outgoing.items:
+        needed[item.part_id] = needed.get(item.part_id, 0) + item.qty
+
+    # One UPDATE parts ... FROM (VALUES ...) that only decrements parts with
+    # enough stock; the row locks it takes make the check race-free
+    need_values = values(
+        column("id", PG_UUID(as_uuid=True)), column("qty", Integer), name="v"
+    ).data(list(needed.items()))
+    update_result = await db.execute(
+        update(Part)
+        .where(and_(Part.id == need_values.c.id, Part.stock >= need_values.c.qty))
+        .values(stock=Part.stock - need_values.c.qty)
+        .returning(Part.id, Part.stock)
+        .execution_options(synchronize_session=False)
+    )
+    stock_after: dict[UUID, int] = dict(update_result.tuples().all())
+
+    if len(stock_after) < len(needed):
+        # Report the first short part; the partial UPDATE is rolled back with the session
+        short_id = next(part_id for part_id in needed if part_id not in stock_after)
+        part_number, available = (
+            await db.execute(select(Part.part_number, Part.stock).where(Part.id == short_id))
+        ).one()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Insufficient stock for part {part_number} (available: {available}, requested: {needed[short_id]})",
+        )
+
+    # Rebuild per-item stock_before/after from the pre-update stock and write
+    # all movements in one executemany INSERT
+    stock_before = {part_id: stock_after[part_id] + qty for part_id, qty in needed.items()}
+    movement_rows = chain_movement_rows(outgoing.items, stock_before, "out", "Outgoings", outgoing.id)
+    await db.execute(insert(PartMovement), movement_rows)
+
+
 @router.put("/{outgoing_id}/complete", response_model=OutgoingResponse, dependencies=[Depends(require_permission("outgoings.complete"))])
 async def complete_outgoing(
     outgoing_id: UUID,
@@ -216,69 +282,27 @@ async def complete_outgoing(
     """
     Complete an outgoing (draft → completed).
     
-    Validates sufficient stock, creates PartMovements, and updates part stock with row-level locking.
+    Claims the draft, then updates part stock in one guarded UPDATE and
+    creates PartMovements; any shortfall rolls the whole transaction back.
     """
-    stmt = (
-        select(Outgoing)
-        .where(and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None)))
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(_COMPLETE_OUTGOING_STMT, {"outgoing_id": outgoing_id})
     outgoing = result.scalar_one_or_none()
 
     if not outgoing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Outgoing not found"
-        )
-
-    if outgoing.status != DocumentStatus.DRAFT.value:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Outgoing status is {outgoing.status}, cannot complete",
-        )
-
-    # Batch fetch all parts with row-level locking (SELECT FOR UPDATE)
-    part_ids = [item.part_id for item in outgoing.items]
-    parts_stmt = select(Part).where(Part.id.in_(part_ids)).with_for_update()
-    parts_result = await db.execute(parts_stmt)
-    parts_map = {part.id: part for part in parts_result.scalars().all()}
-
-    # Validate sufficient stock before making any changes
-    for item in outgoing.items:
-        part = parts_map[item.part_id]
-        if part.stock < item.qty:
+        # Only the failure path pays for a second query to pick the status code
+        current_status = await db.scalar(_OUTGOING_STATUS_STMT, {"outgoing_id": outgoing_id})
+        if current_status is None:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Insufficient stock for part {part.part_number} (available: {part.stock}, requested: {item.qty})",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Outgoing not found"
             )
-
-    # Process each item and create movements
-    for item in outgoing.items:
-        part = parts_map[item.part_id]
-        stock_before = part.stock
-        part.stock -= item.qty
-
-        movement = PartMovement(
-            part_id=item.part_id,
-            stock_before=stock_before,
-            type="out",
-            qty=item.qty,
-            stock_after=part.stock,
-            reference_type="Outgoings",
-            reference_id=outgoing.id,
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Outgoing status is {current_status}, cannot complete",
         )
-        db.add(movement)
 
-    outgoing.status = DocumentStatus.COMPLETED.value
+    await _issue_stock(db, outgoing)
     await db.commit()
-    
-    stmt = (
-        select(Outgoing)
-        .where(Outgoing.id == outgoing.id)
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
-    return OutgoingResponse.model_validate(result.scalar_one())
+    return OutgoingResponse.model_validate(outgoing)
 
 
 @router.put("/{outgoing_id}/cancel", response_model=OutgoingResponse, dependencies=[Depends(require_permission("outgoings.cancel"))])
@@ -288,12 +312,13 @@ async def cancel_outgoing(
     current_user: CurrentUser,
 ) -> OutgoingResponse:
     """Cancel an outgoing (transitions status → cancelled)."""
-    stmt = (
-        select(Outgoing)
+    result = await db.execute(
+        update(Outgoing)
         .where(and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None)))
+        .values(status=DocumentStatus.CANCELLED.value)
+        .returning(Outgoing)
         .options(selectinload(Outgoing.items))
     )
-    result = await db.execute(stmt)
     outgoing = result.scalar_one_or_none()
 
     if not outgoing:
@@ -301,16 +326,8 @@ async def cancel_outgoing(
             status_code=status.HTTP_404_NOT_FOUND, detail="Outgoing not found"
         )
 
-    outgoing.status = DocumentStatus.CANCELLED.value
     await db.commit()
-    
-    stmt = (
-        select(Outgoing)
-        .where(Outgoing.id == outgoing.id)
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
-    return OutgoingResponse.model_validate(result.scalar_one())
+    return OutgoingResponse.model_validate(outgoing)
 
 
 @router.put("/{outgoing_id}/confirm-gi", response_model=OutgoingResponse, dependencies=[Depends(require_permission("outgoings.confirm_gi"))])
@@ -320,32 +337,34 @@ async def confirm_gi(
     current_user: CurrentUser,
 ) -> OutgoingResponse:
     """Confirm outgoing as Goods Issue (GI)."""
-    stmt = (
-        select(Outgoing)
-        .where(and_(Outgoing.id == outgoing_id, Outgoing.deleted_at.is_(None)))
+    # The guard from can_be_gi_confirmed() lives in the WHERE clause
+    result = await db.execute(
+        update(Outgoing)
+        .where(
+            and_(
+                Outgoing.id == outgoing_id,
+                Outgoing.deleted_at.is_(None),
+                Outgoing.status == DocumentStatus.COMPLETED.value,
+                Outgoing.is_gi.is_(False),
+            )
+        )
+        .values(is_gi=True)
+        .returning(Outgoing)
         .options(selectinload(Outgoing.items))
     )
-    result = await db.execute(stmt)
     outgoing = result.scalar_one_or_none()
 
     if not outgoing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Outgoing not found"
-        )
-
-    if not outgoing.can_be_gi_confirmed():
+        # Only the failure path pays for a second query to pick the status code
+        exists = await db.scalar(_OUTGOING_EXISTS_STMT, {"outgoing_id": outgoing_id})
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Outgoing not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Outgoing cannot be confirmed as GI (must be completed and not yet confirmed)",
         )
 
-    outgoing.is_gi = True
     await db.commit()
-    
-    stmt = (
-        select(Outgoing)
-        .where(Outgoing.id == outgoing.id)
-        .options(selectinload(Outgoing.items))
-    )
-    result = await db.execute(stmt)
-    return OutgoingResponse.model_validate(result.scalar_one())
+    return OutgoingResponse.model_validate(outgoing)
@@ -1,27 +1,37 @@
 """Parts inventory management routes."""
 
-from datetime import datetime, timezone, date, time
-from typing import Annotated, List
+import hashlib
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone, date, timedelta
+from typing import Annotated, Any
 from uuid import UUID
-import redis.asyncio as redis
 import logging
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, Header
-from sqlalchemy import and_, func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.database import get_db
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Date, and_, bindparam, func, literal, select, tuple_, update
+from redis.exceptions import ResponseError
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+
+from app.core.cache import TTLLRUCache, invalidate_on_commit
+from app.core.config import now_jakarta, settings
+from app.core.database import STRICT_LOADING, get_db
 from app.core.deps import CurrentUser, require_permission
-from app.models import Part, PartMovement
+from app.core.pagination import decode_cursor, encode_cursor, fetch_page_with_total, page_response
+from app.core.redis import redis_client
+from app.models import Outgoing, Part, PartMovement, Receiving, Request
 from app.schemas import (
     PaginatedResponse,
     PartCreate,
     PartMovementResponse,
     PartResponse,
+    PickAckRequest,
     PickRequest,
     PartUpdate,
     StockStatusFilter,
-    MovementSyncItem,
     MovementSyncResponse,
     PingResponse,
     )
@@ -34,17 +44,74 @@ router = APIRouter(prefix="/parts", tags=["parts"])
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
-# Redis Configuration
-REDIS_URL = "redis://127.0.0.1:6379/0"
-redis_client: redis.Redis = redis.Redis.from_url(REDIS_URL, decode_responses=True)  # type: ignore
-
-GATEWAY_API_KEY = "your-secret-gateway-key-here"
-QUEUE_KEY = "rims:pick_queue"
-
-# Google Sheets sync token (store in environment variables in production)
-GOOGLE_SHEETS_SYNC_TOKEN = "your-google-sheets-sync-token-here"
-
-@router.get("", response_model=PaginatedResponse[PartResponse], dependencies=[Depends(require_permission("parts.view"))])
+_PartListAdapter = TypeAdapter(list[PartResponse])
+_PartMovementListAdapter = TypeAdapter(list[PartMovementResponse])
+_PartPage = PaginatedResponse[PartResponse]
+_PartMovementPage = PaginatedResponse[PartMovementResponse]
+
+# Point lookups built once; handlers only bind part_id
+_PART_FILTER = and_(Part.id == bindparam("part_id"), Part.deleted_at.is_(None))
+_PART_STMT = select(Part).where(_PART_FILTER)
+_PART_EXISTS_STMT = select(Part.id).where(_PART_FILTER)
+
+# Rendered part/list bodies with their ETags, keyed by part id or list query.
+# Dropped whenever a write that can change parts or stock commits in this
+# worker; the short TTL bounds staleness from other workers' writes.
+CachedBody = tuple[bytes, str]
+_part_cache: TTLLRUCache[UUID, CachedBody] = TTLLRUCache(maxsize=1024, ttl_seconds=10.0)
+# Part ids of recently picked part numbers (existence only, never stock)
+_pick_part_ids: TTLLRUCache[str, UUID] = TTLLRUCache(maxsize=1024, ttl_seconds=10.0)
+_part_list_cache: TTLLRUCache[tuple[Any, ...], CachedBody] = TTLLRUCache(maxsize=256, ttl_seconds=10.0)
+# Bumped on every invalidation so a render that started before a write never
+# stores its (now outdated) body
+_parts_cache_generation = 0
+
+
+def invalidate_parts_cache() -> None:
+    """Drop every cached part and part listing."""
+    global _parts_cache_generation
+    _parts_cache_generation += 1
+    _part_cache.clear()
+    _pick_part_ids.clear()
+    _part_list_cache.clear()
+
+
+# Stock also moves through completing/supplying documents, so those count too
+invalidate_on_commit((Part, PartMovement, Receiving, Outgoing, Request), invalidate_parts_cache, "parts_dirty")
+
+
+def _render(model: BaseModel) -> CachedBody:
+    """Serialize a response model and derive its weak ETag from the body."""
+    body = model.model_dump_json().encode()
+    return body, f'W/"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _conditional_response(cached: CachedBody, if_none_match: str | None) -> Response:
+    """Answer 304 when the client already has this body, else send it with its ETag."""
+    body, etag = cached
+    if if_none_match is not None and (
+        if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers={"ETag": etag})
+
+
+# Gateway pick queue: a Redis stream read through one consumer group, so a
+# pick pulled with ack=true but never acknowledged is handed out again
+GATEWAY_API_KEY = settings.gateway_api_key
+QUEUE_KEY = "rims:pick_stream"
+QUEUE_GROUP = "gateway"
+QUEUE_POLL_TIMEOUT = 25  # seconds a gateway's queue/next call may block
+QUEUE_TTL = 86400  # picks older than a day are trimmed from the stream
+QUEUE_ACK_TIMEOUT = 60  # seconds a pulled pick may stay unacknowledged before redelivery
+PICK_EVENTS_CHANNEL = "rims:pick_events"  # pub/sub notice per pick for non-gateway listeners
+LEGACY_QUEUE_KEY = "rims:pick_queue"  # list the queue used before the stream; drained on first pull
+_pick_group_ready = False
+
+# Google Sheets sync token
+GOOGLE_SHEETS_SYNC_TOKEN = settings.google_sheets_sync_token
+
+@router.get("", response_model=_PartPage, dependencies=[Depends(require_permission("parts.view"))])
 async def list_parts(
     db: DB,
     current_user: CurrentUser,
@@ -52,45 +119,62 @@ async def list_parts(
     limit: int = Query(default=20, ge=1, le=100),
     search: str | None = Query(default=None),
     status_filter: StockStatusFilter | None = Query(default=None),
-) -> PaginatedResponse[PartResponse]:
-    """List all parts with optional filtering and pagination."""
+    cursor: str | None = Query(default=None),
+    exact_count: bool = Query(default=False),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """
+    List all parts with optional filtering and pagination.
+    
+    cursor=<next_cursor> for keyset pagination (total only with exact_count=true)
+    Responses carry an ETag; a matching If-None-Match gets 304.
+    """
+    cache_key = (page, limit, search, status_filter, cursor, exact_count)
+    cached = _part_list_cache.get(cache_key)
+    if cached is not None:
+        return _conditional_response(cached, if_none_match)
+    generation = _parts_cache_generation
+
     base_query = select(Part).where(Part.deleted_at.is_(None))
 
     if search:
-        base_query = base_query.where(
-            (Part.part_number.icontains(search))
-            | (Part.part_name.icontains(search))
-            | (Part.customer_code.icontains(search))
-            | (Part.supplier_code.icontains(search))
-            | (Part.model.icontains(search))
-        )
+        # One ILIKE over the generated search column, served by its trigram index
+        base_query = base_query.where(Part.search_text.ilike(f"%{search}%"))
 
     if status_filter == StockStatusFilter.ACTIVE:
         base_query = base_query.where(Part.is_active.is_(True))
     elif status_filter == StockStatusFilter.INACTIVE:
         base_query = base_query.where(Part.is_active.is_(False))
-    elif status_filter == StockStatusFilter.IN_STOCK:
-        base_query = base_query.where(Part.stock > 10)
-    elif status_filter == StockStatusFilter.LOW_STOCK:
-        base_query = base_query.where(and_(Part.stock > 0, Part.stock <= 10))
-    elif status_filter == StockStatusFilter.OUT_OF_STOCK:
-        base_query = base_query.where(Part.stock <= 0)
-
-    count_stmt = select(func.count()).select_from(base_query.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    offset = (page - 1) * limit
-    stmt = base_query.offset(offset).limit(limit)
-    result = await db.execute(stmt)
-    parts = result.scalars().all()
-
-    return PaginatedResponse[PartResponse](
-        items=[PartResponse.model_validate(p) for p in parts],
+    elif status_filter is not None:
+        base_query = base_query.where(Part.stock_status == status_filter.value)
+
+    # Count over the same filters directly; no derived table to materialize
+    count_stmt = base_query.with_only_columns(func.count(Part.id))
+
+    # Seek past the cursor (total only on request) or fall back to offset
+    # paging with the total counted on the same scan
+    stmt = base_query.options(*STRICT_LOADING).order_by(Part.created_at.desc(), Part.id.desc()).limit(limit)
+    total: int | None = None
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Part.created_at, Part.id) < tuple_(cursor_created_at, cursor_id))
+        parts = (await db.execute(stmt)).scalars().all()
+        if exact_count:
+            total = (await db.execute(count_stmt)).scalar_one()
+    else:
+        parts, total = await fetch_page_with_total(db, stmt, count_stmt, (page - 1) * limit)
+    next_cursor = encode_cursor(parts[-1].created_at, parts[-1].id) if len(parts) == limit else None
+
+    cached = _render(_PartPage(
+        items=_PartListAdapter.validate_python(parts, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+        next_cursor=next_cursor,
+    ))
+    if generation == _parts_cache_generation:
+        _part_list_cache.set(cache_key, cached)
+    return _conditional_response(cached, if_none_match)
 
 
 @router.post("/pick", response_model=PartResponse)
@@ -99,41 +183,141 @@ async def pick_part(
     db: DB,
 ) -> PartResponse:
     """Trigger picking process and add part to Redis queue."""
-    stmt = select(Part).where(
-        and_(Part.part_number == payload.part_number, Part.deleted_at.is_(None))
-    )
-    result = await db.execute(stmt)
-    part = result.scalar_one_or_none()
+    # Repeat picks of a hot part reuse its id for a primary-key lookup; the
+    # part, and so its stock, is always read fresh
+    part_id = _pick_part_ids.get(payload.part_number)
+    generation = _parts_cache_generation
+    if part_id is None:
+        stmt = select(Part).where(
+            and_(Part.part_number == payload.part_number, Part.deleted_at.is_(None))
+        )
+        part = (await db.execute(stmt)).scalar_one_or_none()
+    else:
+        part = await db.scalar(_PART_STMT, {"part_id": part_id})
 
     if not part:
-        logger.warning(f"Pick attempt for non-existent part: {payload.part_number}")
+        _pick_part_ids.pop(payload.part_number)
+        logger.warning("Pick attempt for non-existent part: %s", payload.part_number)
         raise HTTPException(status_code=404, detail="Part not found")
 
-    # Add to Redis queue
-    queue_len = await redis_client.rpush(QUEUE_KEY, part.part_number)  # pyright: ignore[reportGeneralTypeIssues, reportUnknownVariableType]
-    logger.info(f"Part {part.part_number} pushed to queue. Current queue length: {queue_len}")
-    
+    if part_id is None and generation == _parts_cache_generation:
+        _pick_part_ids.set(payload.part_number, part.id)
+
+    await _enqueue_pick(payload.part_number)
     return PartResponse.model_validate(part)
 
 
+async def _enqueue_pick(part_number: str) -> None:
+    """Add a pick to the stream and announce it, in one round-trip."""
+    # The push waits for the part to be known to exist: a speculative XADD
+    # undone on a miss could already have been read by a waiting gateway,
+    # dispatching a pick for an unknown part. Day-old picks are trimmed.
+    min_id = f"{(int(time.time()) - QUEUE_TTL) * 1000}-0"
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.xadd(QUEUE_KEY, {"part_number": part_number}, minid=min_id)
+        pipe.publish(PICK_EVENTS_CHANNEL, part_number)
+        pick_id, _ = await pipe.execute()
+    logger.info("Part %s pushed to queue as %s", part_number, pick_id)
+
+
+async def _pull_pick(consumer: str, ack: bool) -> tuple[str, dict[str, str]] | None:
+    """Claim a stale unacknowledged pick (ack mode only) or wait for a new one."""
+    global _pick_group_ready
+    try:
+        if not _pick_group_ready:
+            try:
+                await redis_client.xgroup_create(QUEUE_KEY, QUEUE_GROUP, id="0", mkstream=True)
+            except ResponseError as exc:
+                if "BUSYGROUP" not in str(exc):
+                    raise
+            await _drain_legacy_queue()
+            _pick_group_ready = True
+
+        if ack:
+            # JUSTID names every claimed pick, even one trimmed while pending
+            # (Redis < 7 replies to a plain claim of it with a nil entry that
+            # has no id), so the body is read separately and a trimmed pick is
+            # acknowledged away instead of being claimed again
+            while claimed_ids := await redis_client.xautoclaim(
+                QUEUE_KEY, QUEUE_GROUP, consumer,
+                min_idle_time=QUEUE_ACK_TIMEOUT * 1000, count=1, justid=True,
+            ):
+                pick_id = claimed_ids[0]
+                entries = await redis_client.xrange(QUEUE_KEY, pick_id, pick_id)
+                if entries and "part_number" in entries[0][1]:
+                    return entries[0]
+                await redis_client.xack(QUEUE_KEY, QUEUE_GROUP, pick_id)
+
+        # Blocks until a pick arrives; Redis serves waiting gateways in arrival
+        # order. Without ack the read is final, like the old list pop
+        read = await redis_client.xreadgroup(
+            QUEUE_GROUP, consumer, {QUEUE_KEY: ">"},
+            count=1, block=QUEUE_POLL_TIMEOUT * 1000, noack=not ack,
+        )
+    except ResponseError as exc:
+        if "NOGROUP" not in str(exc):
+            raise
+        # The stream was deleted (e.g. a Redis flush); recreate it on the next pull
+        _pick_group_ready = False
+        return None
+    return read[0][1][0] if read else None
+
+
+async def _drain_legacy_queue() -> None:
+    """Move picks stranded in the pre-stream list queue onto the stream, oldest first."""
+    moved = 0
+    while (part_number := await redis_client.lpop(LEGACY_QUEUE_KEY)) is not None:
+        await redis_client.xadd(QUEUE_KEY, {"part_number": part_number})
+        moved += 1
+    if moved:
+        logger.info("Moved %d picks from %s to %s", moved, LEGACY_QUEUE_KEY, QUEUE_KEY)
+
+
 @router.get("/queue/next", response_model=None)
 async def get_next_command(
-    x_api_key: str = Header(...)
+    x_api_key: str = Header(...),
+    x_gateway_id: str = Header(default="gateway"),
+    ack: bool = Query(default=False),
 ) -> dict[str, str] | Response:
-    """Endpoint for Gateway to pull next command (Atomic Pull)."""
+    """
+    Endpoint for Gateway to pull next command.
+    
+    Long-polls: waits up to QUEUE_POLL_TIMEOUT seconds for a command and returns
+    204 only if none arrived, so the gateway's HTTP read timeout must be longer.
+    With ack=true the pick stays pending until POST /queue/ack with its id and
+    is redelivered if not acknowledged within QUEUE_ACK_TIMEOUT seconds.
+    """
     if x_api_key != GATEWAY_API_KEY:
         logger.warning("Unauthorized access attempt to queue/next")
         raise HTTPException(status_code=401, detail="Invalid API Key")
     
-    # Get item from left side (FIFO)
-    next_part = await redis_client.lpop(QUEUE_KEY)  # type: ignore
+    pick = await _pull_pick(x_gateway_id, ack)
 
-    if not next_part:
-        # Use debug so logs don't fill up when there's no activity
+    if pick is None:
         return Response(status_code=204)
 
-    logger.info(f"Gateway pulled command: {next_part}")
-    return {"part_number": str(next_part)}  # type: ignore
+    pick_id, fields = pick
+    logger.info("Gateway %s pulled command %s: %s", x_gateway_id, pick_id, fields["part_number"])
+    return {"id": pick_id, "part_number": fields["part_number"]}
+
+
+@router.post("/queue/ack", status_code=status.HTTP_204_NO_CONTENT)
+async def ack_command(
+    payload: PickAckRequest,
+    x_api_key: str = Header(...),
+) -> None:
+    """Endpoint for Gateway to confirm a pick pulled with ack=true was carried out."""
+    if x_api_key != GATEWAY_API_KEY:
+        logger.warning("Unauthorized access attempt to queue/ack")
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.xack(QUEUE_KEY, QUEUE_GROUP, payload.id)
+        pipe.xdel(QUEUE_KEY, payload.id)
+        acked, _ = await pipe.execute()
+
+    if not acked:
+        raise HTTPException(status_code=404, detail="Pick not pending")
 
 
 @router.get("/{part_id}", response_model=PartResponse, dependencies=[Depends(require_permission("parts.view"))])
@@ -141,16 +325,22 @@ async def get_part(
     part_id: UUID,
     db: DB,
     current_user: CurrentUser,
-) -> PartResponse:
-    """Get part by ID."""
-    stmt = select(Part).where(and_(Part.id == part_id, Part.deleted_at.is_(None)))
-    result = await db.execute(stmt)
-    part = result.scalar_one_or_none()
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """Get part by ID (with an ETag; a matching If-None-Match gets 304)."""
+    cached = _part_cache.get(part_id)
+    if cached is None:
+        generation = _parts_cache_generation
+        result = await db.execute(_PART_STMT, {"part_id": part_id})
+        part = result.scalar_one_or_none()
 
-    if not part:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
+        if not part:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
 
-    return PartResponse.model_validate(part)
+        cached = _render(PartResponse.model_validate(part))
+        if generation == _parts_cache_generation:
+            _part_cache.set(part_id, cached)
+    return _conditional_response(cached, if_none_match)
 
 
 @router.post("", response_model=PartResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_permission("parts.create"))])
@@ -163,7 +353,6 @@ async def create_part(
     part = Part(**request.model_dump())
     db.add(part)
     await db.commit()
-    await db.refresh(part)
     return PartResponse.model_validate(part)
 
 
@@ -175,19 +364,22 @@ async def update_part(
     current_user: CurrentUser,
 ) -> PartResponse:
     """Update a part."""
-    stmt = select(Part).where(and_(Part.id == part_id, Part.deleted_at.is_(None)))
-    result = await db.execute(stmt)
+    update_data = request.model_dump(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(Part)
+            .where(and_(Part.id == part_id, Part.deleted_at.is_(None)))
+            .values(**update_data)
+            .returning(Part)
+        )
+    else:
+        result = await db.execute(_PART_STMT, {"part_id": part_id})
     part = result.scalar_one_or_none()
 
     if not part:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
 
-    update_data = request.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(part, key, value)
-
     await db.commit()
-    await db.refresh(part)
     return PartResponse.model_validate(part)
 
 
@@ -198,52 +390,72 @@ async def delete_part(
     current_user: CurrentUser,
 ) -> None:
     """Soft-delete a part."""
-    stmt = select(Part).where(and_(Part.id == part_id, Part.deleted_at.is_(None)))
-    result = await db.execute(stmt)
-    part = result.scalar_one_or_none()
+    result = await db.execute(
+        update(Part)
+        .where(and_(Part.id == part_id, Part.deleted_at.is_(None)))
+        .values(deleted_at=now_jakarta())
+        .returning(Part.id)
+    )
 
-    if not part:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
 
-    part.deleted_at = datetime.now(timezone.utc)
     await db.commit()
 
 
-@router.get("/{part_id}/movements", response_model=PaginatedResponse[PartMovementResponse], dependencies=[Depends(require_permission("parts.view"))])
+@router.get("/{part_id}/movements", response_model=_PartMovementPage, dependencies=[Depends(require_permission("parts.view"))])
 async def get_part_movements(
     part_id: UUID,
     db: DB,
     current_user: CurrentUser,
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=20, ge=1, le=100),
-) -> PaginatedResponse[PartMovementResponse]:
-    """Get movement history with pagination."""
-    stmt = select(Part).where(and_(Part.id == part_id, Part.deleted_at.is_(None)))
-    result = await db.execute(stmt)
-    if not result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
-
-    count_stmt = select(func.count()).select_from(PartMovement).where(PartMovement.part_id == part_id)
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    offset = (page - 1) * limit
+    cursor: str | None = Query(default=None),
+    exact_count: bool = Query(default=False),
+) -> Response:
+    """
+    Get movement history with pagination.
+    
+    cursor=<next_cursor> for keyset pagination (total only with exact_count=true)
+    """
+    # The join to the live part replaces a separate existence check
+    live_part = and_(Part.id == PartMovement.part_id, Part.deleted_at.is_(None))
+    count_stmt = (
+        select(func.count())
+        .select_from(PartMovement)
+        .join(Part, live_part)
+        .where(PartMovement.part_id == part_id)
+    )
     stmt = (
         select(PartMovement)
+        .join(Part, live_part)
+        .options(*STRICT_LOADING)
         .where(PartMovement.part_id == part_id)
-        .order_by(PartMovement.created_at.desc())
-        .offset(offset)
+        .order_by(PartMovement.created_at.desc(), PartMovement.id.desc())
         .limit(limit)
     )
-    result = await db.execute(stmt)
-    movements = result.scalars().all()
+    total: int | None = None
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(PartMovement.created_at, PartMovement.id) < tuple_(cursor_created_at, cursor_id))
+        movements = (await db.execute(stmt)).scalars().all()
+        if exact_count:
+            total = (await db.execute(count_stmt)).scalar_one()
+    else:
+        movements, total = await fetch_page_with_total(db, stmt, count_stmt, (page - 1) * limit)
+
+    # An empty page is either a missing/deleted part or just no (more) history
+    if not movements and await db.scalar(_PART_EXISTS_STMT, {"part_id": part_id}) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
+    next_cursor = encode_cursor(movements[-1].created_at, movements[-1].id) if len(movements) == limit else None
 
-    return PaginatedResponse[PartMovementResponse](
-        items=[PartMovementResponse.model_validate(m) for m in movements],
+    return page_response(_PartMovementPage(
+        items=_PartMovementListAdapter.validate_python(movements, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+        next_cursor=next_cursor,
+    ))
 
 
 # =============================================
@@ -258,26 +470,24 @@ async def sync_movements_for_sheets(
     part_number: str | None = Query(default=None, description="Filter by part number"),
     movement_type: str | None = Query(default=None, description="Filter by movement type (IN/OUT)"),
     token: str = Query(..., description="API token for authentication"),
-) -> MovementSyncResponse:
+) -> StreamingResponse:
     """
     Special endpoint for Google Sheets sync with simplified authentication.
     Returns data in exact format needed for spreadsheet: part_number | date | time | type | qty
     """
     # Validate token
     if token != GOOGLE_SHEETS_SYNC_TOKEN:
-        logger.warning(f"Invalid sync token attempt: {token}")
+        logger.warning("Invalid sync token attempt: %s", token)
         raise HTTPException(status_code=401, detail="Invalid sync token")
     
-    # Build query
-    start_datetime = datetime.combine(start_date, time.min)
-    end_datetime = datetime.combine(end_date, time.max)
-    
+    # Build query over the half-open [start_date, end_date + 1 day) range
+    # Only the columns the sheet needs; no ORM entities per row
     base_query = (
-        select(PartMovement, Part.part_number)
+        select(Part.part_number, PartMovement.created_at, PartMovement.type, PartMovement.qty)
         .join(Part, PartMovement.part_id == Part.id)
         .where(Part.deleted_at.is_(None))
-        .where(PartMovement.created_at >= start_datetime)
-        .where(PartMovement.created_at <= end_datetime)
+        .where(PartMovement.created_at >= literal(start_date, Date))
+        .where(PartMovement.created_at < literal(end_date + timedelta(days=1), Date))
     )
     
     # Apply additional filters if provided
@@ -287,41 +497,39 @@ async def sync_movements_for_sheets(
     if movement_type:
         base_query = base_query.where(PartMovement.type == movement_type.lower())
     
-    # Order by date/time
+    # Order by date/time; the range is unbounded, so rows are streamed from a
+    # server-side cursor in batches and written out as they arrive instead of
+    # buffering the whole result (or the whole JSON body)
     stmt = (
         base_query
         .order_by(PartMovement.created_at.asc())  # Oldest first for chronological order
+        .execution_options(yield_per=1000)
     )
     
-    result = await db.execute(stmt)
-    rows = result.all()
-    
-    # Format data for Google Sheets
-    sync_data: List[MovementSyncItem] = []
-    for movement, part_num in rows:
-        created_at = movement.created_at
-        
-        # Format date and time
-        date_str = created_at.strftime("%Y-%m-%d")
-        time_str = created_at.strftime("%H:%M:%S")
-        
-        # Format type to uppercase (IN/OUT)
-        movement_type_upper = movement.type.upper()
-        
-        sync_item = MovementSyncItem(
-            part_number=part_num,
-            date=date_str,
-            time=time_str,
-            type=movement_type_upper,
-            qty=movement.qty
+    result = await db.stream(stmt)
+    return StreamingResponse(_stream_sync_rows(result), media_type=ORJSONResponse.media_type)
+
+
+async def _stream_sync_rows(result: AsyncResult[Any]) -> AsyncIterator[bytes]:
+    """Write a MovementSyncResponse body one cursor batch at a time."""
+    yield b'{"success":true,"data":['
+    total = 0
+    async for rows in result.partitions():
+        # Same shape as MovementSyncItem (part_number | date | time | type | qty);
+        # egress-only, so plain dicts skip model validation
+        chunk = b",".join(
+            orjson.dumps({
+                "part_number": part_num,
+                "date": created_at.strftime("%Y-%m-%d"),
+                "time": created_at.strftime("%H:%M:%S"),
+                "type": movement_type_value.upper(),
+                "qty": qty,
+            })
+            for part_num, created_at, movement_type_value, qty in rows
         )
-        sync_data.append(sync_item)
-    
-    return MovementSyncResponse(
-        success=True,
-        data=sync_data,
-        total=len(sync_data)
-    )
+        yield chunk if total == 0 else b"," + chunk
+        total += len(rows)
+    yield b'],"total":' + str(total).encode() + b"}"
 
 
 @router.get("/sync/ping", response_model=PingResponse)
@@ -1,22 +1,40 @@
 """Incoming goods receipt (Receiving) management routes."""
 
-from datetime import datetime, timezone
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Integer,
+    StatementLambdaElement,
+    and_,
+    bindparam,
+    column,
+    func,
+    insert,
+    lambda_stmt,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.config import now_jakarta
+from app.core.database import STRICT_LOADING, estimate_row_count, get_db
 from app.core.deps import CurrentUser, require_permission
+from app.core.pagination import decode_cursor, encode_cursor, page_response
+from app.core.stock import chain_movement_rows
 from app.models import Part, PartMovement, Receiving, ReceivingItem
 from app.schemas import (
     DocumentStatus,
     PaginatedResponse,
     ReceivingCreate,
     ReceivingResponse,
+    ReceivingSummaryResponse,
     ReceivingUpdate,
 )
 
@@ -25,8 +43,47 @@ router = APIRouter(prefix="/receivings", tags=["receivings"])
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
+_ReceivingListAdapter = TypeAdapter(list[ReceivingResponse])
+_ReceivingSummaryListAdapter = TypeAdapter(list[ReceivingSummaryResponse])
+_ReceivingPage = PaginatedResponse[ReceivingResponse | ReceivingSummaryResponse]
+
+# Summary rows sum item quantities in SQL instead of loading every line item
+_RECEIVING_SUMMARY_COLUMNS = (Receiving.__table__, Receiving.total_items.label("total_items"))
+
 
-@router.get("", response_model=PaginatedResponse[ReceivingResponse], dependencies=[Depends(require_permission("receivings.view"))])
+def _receiving_with_items_stmt(receiving_id: UUID) -> StatementLambdaElement:
+    """Select a non-deleted receiving with its items; the statement is built once and cached."""
+    return lambda_stmt(
+        lambda: select(Receiving)
+        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
+        .options(selectinload(Receiving.items))
+    )
+
+
+def _receiving_stmt(receiving_id: UUID) -> StatementLambdaElement:
+    """Select a non-deleted receiving without its items."""
+    return lambda_stmt(
+        lambda: select(Receiving)
+        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
+    )
+
+
+# draft → completed as one guarded UPDATE; a concurrent or retried completion
+# waits on the row lock, then matches nothing once this one commits
+_RECEIVING_FILTER = and_(Receiving.id == bindparam("receiving_id"), Receiving.deleted_at.is_(None))
+_RECEIVING_STATUS_STMT = select(Receiving.status).where(_RECEIVING_FILTER)
+_COMPLETE_RECEIVING_STMT = (
+    update(Receiving)
+    .where(and_(_RECEIVING_FILTER, Receiving.status == DocumentStatus.DRAFT.value))
+    .values(status=DocumentStatus.COMPLETED.value)
+    .returning(Receiving)
+    .options(selectinload(Receiving.items))
+    # A receiving already in the session takes the returned (completed) row
+    .execution_options(populate_existing=True)
+)
+
+
+@router.get("", response_model=_ReceivingPage, dependencies=[Depends(require_permission("receivings.view"))])
 async def list_receivings(
     db: DB,
     current_user: CurrentUser,
@@ -35,12 +92,18 @@ async def list_receivings(
     status_filter: DocumentStatus | None = Query(default=None),
     pending_gr: bool = Query(default=False),
     doc_number: str | None = Query(default=None),
-) -> PaginatedResponse[ReceivingResponse]:
+    cursor: str | None = Query(default=None),
+    exact_count: bool = Query(default=False),
+    include_items: bool = Query(default=False),
+) -> Response:
     """
     List all receivings with optional filtering and pagination.
     
     status_filter options: draft, completed, cancelled
     pending_gr=true to get receivings awaiting GR confirmation
+    cursor=<next_cursor> for keyset pagination (total only with exact_count=true)
+    exact_count=true for an exact total when unfiltered (otherwise the planner's estimate)
+    include_items=true to return full receivings with line items instead of summaries
     """
     filters = [Receiving.deleted_at.is_(None)]
 
@@ -53,29 +116,43 @@ async def list_receivings(
     if doc_number:
         filters.append(Receiving.doc_number.icontains(doc_number))
 
-    # Count total
-    count_stmt = select(func.count()).select_from(Receiving).where(*filters)
-    total = int((await db.execute(count_stmt)).scalar() or 0)
-
-    # Fetch page with eager loading
-    offset = (page - 1) * limit
-    stmt = (
-        select(Receiving)
-        .where(*filters)
-        .options(selectinload(Receiving.items))
-        .order_by(Receiving.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-    )
+    # Shared filtered base for both the count and the page
+    base = select(Receiving).where(*filters)
+
+    # Count total (skipped in cursor mode unless requested). With only the
+    # soft-delete filter the planner's estimate stands in for COUNT(*) unless
+    # an exact count is asked for; it includes deleted rows, so it is approximate
+    total: int | None = None
+    if cursor is None and not exact_count and len(filters) == 1:
+        total = await estimate_row_count(db, Receiving.__tablename__)
+    if total is None and (cursor is None or exact_count):
+        count_stmt = base.with_only_columns(func.count(Receiving.id)).order_by(None)
+        total = (await db.execute(count_stmt)).scalar_one()
+
+    # Fetch page (summary rows unless items are requested); seek past the cursor
+    # or fall back to offset paging
+    if include_items:
+        stmt = base.options(selectinload(Receiving.items), *STRICT_LOADING)
+    else:
+        stmt = base.with_only_columns(*_RECEIVING_SUMMARY_COLUMNS)
+    stmt = stmt.order_by(Receiving.created_at.desc(), Receiving.id.desc()).limit(limit)
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Receiving.created_at, Receiving.id) < tuple_(cursor_created_at, cursor_id))
+    else:
+        stmt = stmt.offset((page - 1) * limit)
     result = await db.execute(stmt)
-    receivings = result.scalars().all()
+    receivings = result.scalars().all() if include_items else result.all()
+    next_cursor = encode_cursor(receivings[-1].created_at, receivings[-1].id) if len(receivings) == limit else None
 
-    return PaginatedResponse[ReceivingResponse](
-        items=[ReceivingResponse.model_validate(r) for r in receivings],
+    adapter = _ReceivingListAdapter if include_items else _ReceivingSummaryListAdapter
+    return page_response(_ReceivingPage(
+        items=adapter.validate_python(receivings, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+        next_cursor=next_cursor,
+    ))
 
 
 @router.get("/{receiving_id}", response_model=ReceivingResponse, dependencies=[Depends(require_permission("receivings.view"))])
@@ -85,11 +162,7 @@ async def get_receiving(
     current_user: CurrentUser,
 ) -> ReceivingResponse:
     """Get receiving with nested items."""
-    stmt = (
-        select(Receiving)
-        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
-        .options(selectinload(Receiving.items))
-    )
+    stmt = _receiving_with_items_stmt(receiving_id)
     result = await db.execute(stmt)
     receiving = result.scalar_one_or_none()
 
@@ -123,15 +196,11 @@ async def create_receiving(
 
     db.add(receiving)
     await db.commit()
-    
-    # Reload with items relationship
-    stmt = (
-        select(Receiving)
-        .where(Receiving.id == receiving.id)
-        .options(selectinload(Receiving.items))
-    )
-    result = await db.execute(stmt)
-    return ReceivingResponse.model_validate(result.scalar_one())
+
+    # Ids, timestamps and items are all set in Python on flush (one INSERT for the
+    # receiving, one multi-row INSERT for its items), so neither RETURNING nor a
+    # reload is needed to build the response
+    return ReceivingResponse.model_validate(receiving)
 
 
 @router.put("/{receiving_id}", response_model=ReceivingResponse, dependencies=[Depends(require_permission("receivings.update"))])
@@ -142,11 +211,7 @@ async def update_receiving(
     current_user: CurrentUser,
 ) -> ReceivingResponse:
     """Update a receiving (only if is_editable)."""
-    stmt = (
-        select(Receiving)
-        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
-        .options(selectinload(Receiving.items))
-    )
+    stmt = _receiving_with_items_stmt(receiving_id)
     result = await db.execute(stmt)
     receiving = result.scalar_one_or_none()
 
@@ -175,14 +240,7 @@ async def update_receiving(
             receiving.items.append(item)
 
     await db.commit()
-    
-    stmt = (
-        select(Receiving)
-        .where(Receiving.id == receiving.id)
-        .options(selectinload(Receiving.items))
-    )
-    result = await db.execute(stmt)
-    return ReceivingResponse.model_validate(result.scalar_one())
+    return ReceivingResponse.model_validate(receiving)
 
 
 @router.delete("/{receiving_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_permission("receivings.delete"))])
@@ -203,7 +261,7 @@ async def delete_receiving(
             status_code=status.HTTP_404_NOT_FOUND, detail="Receiving not found"
         )
 
-    receiving.deleted_at = datetime.now(timezone.utc)
+    receiving.deleted_at = now_jakarta()
     await db.commit()
 
 
@@ -216,60 +274,64 @@ async def complete_receiving(
     """
     Complete a receiving (draft → completed).
     
-    Creates PartMovements for all items and updates part stock with row-level locking.
+    Claims the draft, then creates PartMovements for all items and updates
+    part stock with row-level locking.
     """
-    stmt = (
-        select(Receiving)
-        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
-        .options(selectinload(Receiving.items))
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(_COMPLETE_RECEIVING_STMT, {"receiving_id": receiving_id})
     receiving = result.scalar_one_or_none()
 
     if not receiving:
+        # Only the failure path pays for a second query to pick the status code
+        current_status = await db.scalar(_RECEIVING_STATUS_STMT, {"receiving_id": receiving_id})
+        if current_status is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Receiving not found"
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Receiving not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Receiving status is {current_status}, cannot complete",
         )
 
-    if receiving.status != DocumentStatus.DRAFT.value:
+    # Lock the affected parts (SELECT FOR UPDATE) and read only their stock
+    part_ids = {item.part_id for item in receiving.items}
+    stock_stmt = (
+        select(Part.id, Part.stock)
+        .where(and_(Part.id.in_(part_ids), Part.deleted_at.is_(None)))
+        .with_for_update()
+    )
+    stock_map: dict[UUID, int] = dict((await db.execute(stock_stmt)).tuples().all())
+
+    missing = part_ids - stock_map.keys()
+    if missing:
+        # The claim above is rolled back with the session
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Receiving status is {receiving.status}, cannot complete",
+            detail=f"Part {min(missing)} not found or deleted, cannot complete",
         )
 
-    # Batch fetch all parts with row-level locking (SELECT FOR UPDATE)
-    part_ids = [item.part_id for item in receiving.items]
-    parts_stmt = select(Part).where(Part.id.in_(part_ids)).with_for_update()
-    parts_result = await db.execute(parts_stmt)
-    parts_map = {part.id: part for part in parts_result.scalars().all()}
-
-    # Process each item and create movements
+    # Build movement rows (chaining when a part repeats) and per-part deltas
+    movement_rows = chain_movement_rows(receiving.items, stock_map, "in", "Receivings", receiving.id)
+    deltas: dict[UUID, int] = {}
     for item in receiving.items:
-        part = parts_map[item.part_id]
-        stock_before = part.stock
-        part.stock += item.qty
-
-        movement = PartMovement(
-            part_id=item.part_id,
-            stock_before=stock_before,
-            type="in",
-            qty=item.qty,
-            stock_after=part.stock,
-            reference_type="Receivings",
-            reference_id=receiving.id,
+        deltas[item.part_id] = deltas.get(item.part_id, 0) + item.qty
+
+    if movement_rows:
+        # One multi-row INSERT for all movements
+        await db.execute(insert(PartMovement), movement_rows)
+
+        # One UPDATE parts ... FROM (VALUES ...) for all stock deltas
+        delta_values = values(
+            column("id", PG_UUID(as_uuid=True)), column("delta", Integer), name="v"
+        ).data(list(deltas.items()))
+        await db.execute(
+            update(Part)
+            .where(Part.id == delta_values.c.id)
+            .values(stock=Part.stock + delta_values.c.delta)
+            .execution_options(synchronize_session=False)
         )
-        db.add(movement)
 
-    receiving.status = DocumentStatus.COMPLETED.value
     await db.commit()
-    
-    stmt = (
-        select(Receiving)
-        .where(Receiving.id == receiving.id)
-        .options(selectinload(Receiving.items))
-    )
-    result = await db.execute(stmt)
-    return ReceivingResponse.model_validate(result.scalar_one())
+    return ReceivingResponse.model_validate(receiving)
 
 
 @router.put("/{receiving_id}/cancel", response_model=ReceivingResponse, dependencies=[Depends(require_permission("receivings.cancel"))])
@@ -279,11 +341,7 @@ async def cancel_receiving(
     current_user: CurrentUser,
 ) -> ReceivingResponse:
     """Cancel a receiving (transitions status → cancelled)."""
-    stmt = (
-        select(Receiving)
-        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
-        .options(selectinload(Receiving.items))
-    )
+    stmt = _receiving_stmt(receiving_id)
     result = await db.execute(stmt)
     receiving = result.scalar_one_or_none()
 
@@ -294,14 +352,9 @@ async def cancel_receiving(
 
     receiving.status = DocumentStatus.CANCELLED.value
     await db.commit()
-    
-    stmt = (
-        select(Receiving)
-        .where(Receiving.id == receiving.id)
-        .options(selectinload(Receiving.items))
-    )
-    result = await db.execute(stmt)
-    return ReceivingResponse.model_validate(result.scalar_one())
+    # Items are only needed for the response; load them once the transition succeeded
+    await db.refresh(receiving, attribute_names=["items"])
+    return ReceivingResponse.model_validate(receiving)
 
 
 @router.put("/{receiving_id}/confirm-gr", response_model=ReceivingResponse, dependencies=[Depends(require_permission("receivings.confirm_gr"))])
@@ -311,11 +364,7 @@ async def confirm_gr(
     current_user: CurrentUser,
 ) -> ReceivingResponse:
     """Confirm receiving as Goods Receipt (GR)."""
-    stmt = (
-        select(Receiving)
-        .where(and_(Receiving.id == receiving_id, Receiving.deleted_at.is_(None)))
-        .options(selectinload(Receiving.items))
-    )
+    stmt = _receiving_stmt(receiving_id)
     result = await db.execute(stmt)
     receiving = result.scalar_one_or_none()
 
@@ -332,11 +381,5 @@ async def confirm_gr(
 
     receiving.is_gr = True
     await db.commit()
-    
-    stmt = (
-        select(Receiving)
-        .where(Receiving.id == receiving.id)
-        .options(selectinload(Receiving.items))
-    )
-    result = await db.execute(stmt)
-    return ReceivingResponse.model_validate(result.scalar_one())
+    await db.refresh(receiving, attribute_names=["items"])
+    return ReceivingResponse.model_validate(receiving)
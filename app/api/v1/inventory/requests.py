@@ -1,18 +1,20 @@
 """Parts request management routes."""
 
 import uuid
-from datetime import datetime, timezone
 from typing import Annotated, Any, TypedDict
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import and_, func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import now_jakarta
 from app.core.database import get_db
 from app.core.deps import CurrentUser
 from app.core.events import broadcaster
+from app.core.pagination import decode_cursor, encode_cursor, fetch_page_with_total, page_response
 from app.models import Part, Request, RequestList, Outgoing, OutgoingItem, PartMovement
 from app.schemas import (
     DocumentStatus,
@@ -26,6 +28,9 @@ from app.schemas import (
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
+_RequestListAdapter = TypeAdapter(list[RequestResponse])
+_RequestPage = PaginatedResponse[RequestResponse]
+
 class ItemDataDict(TypedDict):
     """Type definition for item broadcast data."""
     id: str
@@ -40,8 +45,6 @@ router = APIRouter(prefix="/requests", tags=["requests"])
 
 # --- New: Pick/Check a request item ---
 
-from pydantic import BaseModel
-
 class PickRequestBody(BaseModel):
     item_id: UUID
 
@@ -85,7 +88,7 @@ async def pick_request_item(
     return RequestListResponse.model_validate(item_dict)
 
 
-@router.get("", response_model=PaginatedResponse[RequestResponse])
+@router.get("", response_model=_RequestPage)
 async def list_requests(
     db: DB,
     current_user: CurrentUser,
@@ -93,8 +96,14 @@ async def list_requests(
     limit: int = Query(default=20, ge=1, le=100),
     status_filter: DocumentStatus | None = Query(default=None),
     request_number: str | None = Query(default=None),
-) -> PaginatedResponse[RequestResponse]:
-    """List all requests with optional filtering and pagination."""
+    cursor: str | None = Query(default=None),
+    exact_count: bool = Query(default=False),
+) -> Response:
+    """
+    List all requests with optional filtering and pagination.
+    
+    cursor=<next_cursor> for keyset pagination (total only with exact_count=true)
+    """
     # Permission: requests.view
     if not current_user.has_permission("requests.view"):
         raise HTTPException(status_code=403, detail="Permission denied: requests.view")
@@ -107,29 +116,34 @@ async def list_requests(
     if request_number:
         filters.append(Request.request_number.icontains(request_number))
 
-    # Count total
+    # Fetch page with eager loading; seek past the cursor (total only on
+    # request) or fall back to offset paging with the total counted on the same scan
     count_stmt = select(func.count()).select_from(Request).where(*filters)
-    total = int((await db.execute(count_stmt)).scalar() or 0)
-
-    # Fetch page with eager loading
-    offset = (page - 1) * limit
     stmt = (
         select(Request)
         .where(*filters)
         .options(selectinload(Request.items), selectinload(Request.requested_by_user))
-        .order_by(Request.created_at.desc())
-        .offset(offset)
+        .order_by(Request.created_at.desc(), Request.id.desc())
         .limit(limit)
     )
-    result = await db.execute(stmt)
-    requests = result.scalars().all()
+    total: int | None = None
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Request.created_at, Request.id) < tuple_(cursor_created_at, cursor_id))
+        requests = (await db.execute(stmt)).scalars().all()
+        if exact_count:
+            total = (await db.execute(count_stmt)).scalar_one()
+    else:
+        requests, total = await fetch_page_with_total(db, stmt, count_stmt, (page - 1) * limit)
+    next_cursor = encode_cursor(requests[-1].created_at, requests[-1].id) if len(requests) == limit else None
 
-    return PaginatedResponse[RequestResponse](
-        items=[RequestResponse.model_validate(r) for r in requests],
+    return page_response(_RequestPage(
+        items=_RequestListAdapter.validate_python(requests, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+        next_cursor=next_cursor,
+    ))
 
 
 @router.get("/{request_id}", response_model=RequestResponse)
@@ -241,16 +255,10 @@ async def update_request(
             )
             request_obj.items.append(item)
 
+    # The session keeps loaded state on commit (expire_on_commit=False) and
+    # every default is set client-side, so no reload is needed
     await db.commit()
-    
-    # Refresh to get updated data
-    stmt = (
-        select(Request)
-        .where(Request.id == request_obj.id)
-        .options(selectinload(Request.items), selectinload(Request.requested_by_user))
-    )
-    result = await db.execute(stmt)
-    return RequestResponse.model_validate(result.scalar_one())
+    return RequestResponse.model_validate(request_obj)
 
 
 @router.delete("/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -273,7 +281,7 @@ async def delete_request(
     if not request_obj:
         raise HTTPException(status_code=404, detail="Request not found")
 
-    request_obj.deleted_at = datetime.now(timezone.utc)
+    request_obj.deleted_at = now_jakarta()
     await db.commit()
 
 
@@ -288,35 +296,36 @@ async def complete_request(
     if not current_user.has_permission("requests.complete"):
         raise HTTPException(status_code=403, detail="Permission denied: requests.complete")
     
-    stmt = (
-        select(Request)
-        .where(and_(Request.id == request_id, Request.deleted_at.is_(None)))
+    # draft → completed as one guarded UPDATE returning the loaded request
+    result = await db.execute(
+        update(Request)
+        .where(
+            and_(
+                Request.id == request_id,
+                Request.deleted_at.is_(None),
+                Request.status == DocumentStatus.DRAFT.value,
+            )
+        )
+        .values(status=DocumentStatus.COMPLETED.value)
+        .returning(Request)
         .options(selectinload(Request.items), selectinload(Request.requested_by_user))
     )
-    result = await db.execute(stmt)
     request_obj = result.scalar_one_or_none()
 
     if not request_obj:
-        raise HTTPException(status_code=404, detail="Request not found")
-
-    if request_obj.status != DocumentStatus.DRAFT.value:
+        # Only the failure path pays for a second query to pick the status code
+        current_status = await db.scalar(
+            select(Request.status).where(and_(Request.id == request_id, Request.deleted_at.is_(None)))
+        )
+        if current_status is None:
+            raise HTTPException(status_code=404, detail="Request not found")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Request status is {request_obj.status}, cannot complete",
+            detail=f"Request status is {current_status}, cannot complete",
         )
 
-    request_obj.status = DocumentStatus.COMPLETED.value
     await db.commit()
     
-    # Requery with eager loading
-    stmt = (
-        select(Request)
-        .where(Request.id == request_obj.id)
-        .options(selectinload(Request.items), selectinload(Request.requested_by_user))
-    )
-    result = await db.execute(stmt)
-    request_obj = result.scalar_one()
-    
     # Batch fetch all parts for broadcast (avoid N+1)
     part_ids = [item.part_id for item in request_obj.items]
     if part_ids:
@@ -363,27 +372,20 @@ async def cancel_request(
     if not current_user.has_permission("requests.cancel"):
         raise HTTPException(status_code=403, detail="Permission denied: requests.cancel")
     
-    stmt = (
-        select(Request)
+    result = await db.execute(
+        update(Request)
         .where(and_(Request.id == request_id, Request.deleted_at.is_(None)))
+        .values(status=DocumentStatus.CANCELLED.value)
+        .returning(Request)
         .options(selectinload(Request.items), selectinload(Request.requested_by_user))
     )
-    result = await db.execute(stmt)
     request_obj = result.scalar_one_or_none()
 
     if not request_obj:
         raise HTTPException(status_code=404, detail="Request not found")
 
-    request_obj.status = DocumentStatus.CANCELLED.value
     await db.commit()
-    
-    stmt = (
-        select(Request)
-        .where(Request.id == request_obj.id)
-        .options(selectinload(Request.items), selectinload(Request.requested_by_user))
-    )
-    result = await db.execute(stmt)
-    return RequestResponse.model_validate(result.scalar_one())
+    return RequestResponse.model_validate(request_obj)
 
 
 @router.put("/items/{item_id}/supply", response_model=RequestResponse)
@@ -439,7 +441,7 @@ async def supply_request_item(
     outgoing = outgoing_result.scalar_one_or_none()
 
     if not outgoing:
-        today = datetime.now().strftime('%d%m%y')
+        today = now_jakarta().strftime('%d%m%y')
         last_doc_stmt = select(func.max(Outgoing.doc_number)).where(
             Outgoing.doc_number.like(f"OUT-{today}-%")
         )
@@ -458,7 +460,7 @@ async def supply_request_item(
             id=uuid.uuid4(),
             doc_number=doc_number,
             issued_by=current_user.id,
-            issued_at=datetime.now(),
+            issued_at=now_jakarta(),
             status="completed",
             notes=str(item.request_id)
         )
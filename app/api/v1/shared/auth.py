@@ -15,6 +15,19 @@ from app.schemas.token import RefreshRequest, RefreshTokenResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Only the columns login needs: the password hash plus what UserResponse shows.
+# Skips 2FA secrets/recovery codes and ORM instance hydration.
+_LOGIN_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.password,
+    User.role,
+    User.permissions,
+    User.email_verified_at,
+    User.created_at,
+    User.updated_at,
+)
 
 @router.post("/login", response_model=TokenResponse)
 async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)) -> Any:
@@ -23,9 +36,11 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)) -> An
     
     Returns a JWT access token and user information.
     """
-    stmt = select(User).where(User.email == request.email)
+    # Never cached: the hash must be fresh so a password change or deleted
+    # user takes effect on every worker immediately
+    stmt = select(*_LOGIN_COLUMNS).where(User.email == request.email)
     result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = result.first()
 
     if not user:
         raise HTTPException(
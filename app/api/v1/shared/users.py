@@ -3,12 +3,14 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.deps import CurrentUser, require_permission
+from app.core.pagination import fetch_page_with_total, page_response
 from app.core.security import hash_password
 from app.models import User
 from app.schemas import PaginatedResponse, UserCreate, UserResponse, UserUpdate
@@ -18,31 +20,29 @@ router = APIRouter(prefix="/users", tags=["users"])
 # Type alias for database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
 
+_UserListAdapter = TypeAdapter(list[UserResponse])
+_UserPage = PaginatedResponse[UserResponse]
 
-@router.get("", response_model=PaginatedResponse[UserResponse], dependencies=[Depends(require_permission("users.view"))])
+
+@router.get("", response_model=_UserPage, dependencies=[Depends(require_permission("users.view"))])
 async def list_users(
     db: DB,
     current_user: CurrentUser,
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=20, ge=1, le=100),
-) -> PaginatedResponse[UserResponse]:
+) -> Response:
     """List all users with pagination."""
-    # Count total
+    # Fetch page; the total is counted on the same scan
     count_stmt = select(func.count()).select_from(User)
-    total = (await db.execute(count_stmt)).scalar() or 0
-    
-    # Fetch page
-    offset = (page - 1) * limit
-    stmt = select(User).offset(offset).limit(limit)
-    result = await db.execute(stmt)
-    users = result.scalars().all()
+    stmt = select(User).limit(limit)
+    users, total = await fetch_page_with_total(db, stmt, count_stmt, (page - 1) * limit)
     
-    return PaginatedResponse[UserResponse](
-        items=[UserResponse.model_validate(u) for u in users],
+    return page_response(_UserPage(
+        items=_UserListAdapter.validate_python(users, from_attributes=True),
         total=total,
         page=page,
         limit=limit,
-    )
+    ))
 
 
 @router.get("/me", response_model=UserResponse, dependencies=[Depends(require_permission("users.view"))])
@@ -0,0 +1,100 @@
+"""Small in-process caches."""
+
+import itertools
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Generic, Hashable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLLRUCache(Generic[K, V]):
+    """
+    Bounded LRU cache whose entries also expire after a fixed TTL.
+    
+    Expiry is checked lazily on get; when full, the least recently used
+    entry is evicted on set.
+    """
+
+    __slots__ = ("maxsize", "ttl_ns", "_data")
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_ns = int(ttl_seconds * 1_000_000_000)
+        self._data: OrderedDict[K, tuple[int, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Return a live entry (marking it recently used), or None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic_ns() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        """
+        Store an entry, evicting the least recently used one when full.
+        
+        ttl_seconds can only shorten this entry's lifetime below the cache TTL.
+        """
+        ttl_ns = self.ttl_ns if ttl_seconds is None else min(self.ttl_ns, int(ttl_seconds * 1_000_000_000))
+        self._data[key] = (time.monotonic_ns() + ttl_ns, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Drop an entry if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def invalidate_on_commit(models: tuple[type, ...], callback: Callable[[], None], flag: str) -> None:
+    """
+    Call `callback` after every commit whose flushes or ORM UPDATE/INSERT/DELETE
+    statements touched `models`.
+    
+    `flag` names the session.info marker, so each registration needs its own.
+    Only this worker's commits are seen; caches must still expire on their own.
+    """
+
+    @event.listens_for(Session, "after_flush")
+    def _track_writes(session: Session, flush_context: Any) -> None:
+        if any(
+            isinstance(obj, models)
+            for obj in itertools.chain(session.new, session.dirty, session.deleted)
+        ):
+            session.info[flag] = True
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _track_statement_writes(state: ORMExecuteState) -> None:
+        # Bulk UPDATE ... RETURNING and friends never pass through a flush
+        if (state.is_update or state.is_insert or state.is_delete) and (
+            state.bind_mapper is not None and issubclass(state.bind_mapper.class_, models)
+        ):
+            state.session.info[flag] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate_after_commit(session: Session) -> None:
+        if session.info.pop(flag, False):
+            callback()
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard_writes(session: Session) -> None:
+        # Rolled-back changes never reached the database
+        session.info.pop(flag, None)
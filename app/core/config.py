@@ -5,7 +5,7 @@ import os
 from zoneinfo import ZoneInfo
 from typing import List
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from functools import lru_cache
+from functools import cached_property, lru_cache
 
 # Jakarta timezone (UTC+7)
 TIMEZONE = ZoneInfo("Asia/Jakarta")
@@ -42,6 +42,16 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800  # Seconds before a pooled connection is replaced
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 256  # Prepared statements kept per connection
+    db_pgbouncer: bool = False  # Behind PgBouncer (transaction mode): no app pool or statement cache
+    
+    # Redis (parts pick queue)
+    redis_url: str = "redis://127.0.0.1:6379/0"
+    redis_max_connections: int = 50  # Per worker; also caps concurrent gateway long-polls
     
     # Security
     secret_key: str
@@ -55,6 +65,10 @@ class Settings(BaseSettings):
     api_domain: str = "api.r-dev.asia"
     frontend_domain: str = "rims.r-dev.asia"
     
+    # Integrations
+    gateway_api_key: str = "your-secret-gateway-key-here"
+    google_sheets_sync_token: str = "your-google-sheets-sync-token-here"
+    
     REFRESH_SECRET_KEY: str = os.getenv("REFRESH_SECRET_KEY", "refresh_secret")
     REFRESH_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 43200))
     timezone: str = "Asia/Jakarta"
@@ -66,7 +80,7 @@ class Settings(BaseSettings):
     rate_limit_auth_per_minute: int = 10
     
     # Cloudflare
-    cloudflare_enabled: bool = False  # Auto-detect from headers
+    cloudflare_enabled: bool = False  # Edge handles compression; disables origin gzip
     validate_cloudflare_ip: bool = True  # Only in production
     
     # Logging
@@ -77,22 +91,25 @@ class Settings(BaseSettings):
         case_sensitive=False,
     )
     
-    @property
+    # Derived values below are read per request by middleware; settings never
+    # change after load, so each is computed once and cached on the instance.
+    
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production."""
         return self.environment.lower() == "production"
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development."""
         return self.environment.lower() == "development"
     
-    @property
+    @cached_property
     def allowed_origins_list(self) -> List[str]:
         """Parse allowed origins from comma-separated string."""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     
-    @property
+    @cached_property
     def allowed_hosts(self) -> List[str]:
         """Get allowed hosts based on environment."""
         if self.is_development:
@@ -104,7 +121,7 @@ class Settings(BaseSettings):
             "127.0.0.1",
         ]
     
-    @property
+    @cached_property
     def should_validate_cloudflare(self) -> bool:
         """Should validate Cloudflare IPs."""
         return self.is_production and self.validate_cloudflare_ip
@@ -1,36 +1,89 @@
 """Database connection and session management."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Any
+from uuid import uuid4
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
 
-# Create async engine with connection pooling for production
+# Pooling and prepared-statement caching. Behind PgBouncer in transaction mode
+# consecutive statements may land on different server connections, so the app
+# must neither hold its own pool nor rely on named prepared statements.
+_engine_options: dict[str, Any]
+if settings.db_pgbouncer:
+    _engine_options = {"poolclass": NullPool}
+    _statement_cache_args: dict[str, Any] = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+else:
+    _engine_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_size": settings.db_pool_size,            # Base pool size
+        "max_overflow": settings.db_max_overflow,      # Additional connections when pool is full
+        "pool_timeout": 30,                            # Seconds to wait for available connection
+        "pool_recycle": settings.db_pool_recycle,      # Recycle connections periodically
+        "pool_use_lifo": True,                         # Reuse hot connections; idle ones age out
+        "pool_reset_on_return": "rollback",
+    }
+    # Recurring queries reuse their server-side plan instead of re-parsing
+    _statement_cache_args = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+
+# Create async engine (asyncpg driver) with connection pooling for production
 engine = create_async_engine(
     settings.database_url,
     echo=False,
     future=True,
-    pool_pre_ping=True,
-    pool_size=10,          # Base pool size
-    max_overflow=20,       # Additional connections when pool is full
-    pool_timeout=30,       # Seconds to wait for available connection
-    pool_recycle=1800,     # Recycle connections after 30 minutes
+    **_engine_options,
+    # JIT only pays off for long analytical queries; skip its warmup cost
+    connect_args={
+        "server_settings": {"tcp_keepalives_idle": "30", "jit": "off"},
+        **_statement_cache_args,
+    },
+    # JSON/JSONB columns (e.g. users.permissions) go through orjson
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
 )
 
 # Create async session factory
-AsyncSessionLocal = sessionmaker(
+AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
     expire_on_commit=False,
-    autocommit=False,
     autoflush=False,
 )
 
+# Loader options for list queries: in debug mode any relationship that was not
+# explicitly eager-loaded raises instead of silently issuing an N+1 lazy load.
+STRICT_LOADING = (raiseload("*"),) if settings.debug else ()
+
 
 async def get_db() -> AsyncSession:
     """Dependency to get async database session."""
+    # The context manager already closes the session (rolling back any open
+    # transaction) on exit, including when the request raises.
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
+
+
+async def estimate_row_count(db: AsyncSession, table_name: str) -> int | None:
+    """
+    Planner row estimate for a whole table from pg_class.reltuples.
+    
+    Much cheaper than COUNT(*) on large tables; returns None when the table
+    has never been analyzed so callers can fall back to an exact count.
+    """
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)"),
+        {"table_name": table_name},
+    )
+    estimate = result.scalar_one_or_none()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
@@ -1,23 +1,26 @@
 """FastAPI dependencies for authentication and authorization."""
 
+import math
 import time
+from functools import lru_cache
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLLRUCache
 from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.security import decode_token_claims, token_digest
 from app.models import User
 
 # HTTP Bearer token scheme
 bearer_scheme = HTTPBearer(auto_error=True)
 
-_CURRENT_USER_CACHE_TTL_SECONDS = 10.0
-_current_user_cache: dict[UUID, tuple[float, User]] = {}
+# Keyed by a digest of the bearer token so raw tokens are never held in memory;
+# an entry never outlives its token's exp
+_current_user_cache: TTLLRUCache[bytes, User] = TTLLRUCache(maxsize=10_000, ttl_seconds=10.0)
 
 
 async def get_current_user(
@@ -30,15 +33,23 @@ async def get_current_user(
     Raises HTTPException 401 if token is invalid or user not found.
     """
     token = credentials.credentials
-    user_id = verify_token(token)
+    # Expiry and signature are checked on every request (the signature check
+    # is cached); only then may a cached user be returned
+    claims = decode_token_claims(token)
     
-    if user_id is None:
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_id, exp = claims
+    token_key = token_digest(token)
+    cached_user = _current_user_cache.get(token_key)
+    if cached_user is not None:
+        return cached_user
+    
     try:
         user_uuid = UUID(user_id)
     except ValueError:
@@ -48,16 +59,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    cached = _current_user_cache.get(user_uuid)
-    now = time.monotonic()
-    if cached is not None:
-        cached_at, cached_user = cached
-        if now - cached_at <= _CURRENT_USER_CACHE_TTL_SECONDS:
-            return cached_user
-
-    stmt = select(User).where(User.id == user_uuid)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    # Primary-key lookup checks the identity map before emitting a SELECT
+    user = await db.get(User, user_uuid)
     
     if user is None:
         raise HTTPException(
@@ -66,7 +69,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    _current_user_cache[user_uuid] = (now, user)
+    # Never outlive the token; a non-finite exp can't be turned into a TTL, so
+    # such an entry just gets the cache's own TTL
+    ttl_seconds = max(0.0, exp - time.time()) if math.isfinite(exp) else None
+    _current_user_cache.set(token_key, user, ttl_seconds=ttl_seconds)
     return user
 
 
@@ -74,15 +80,19 @@ async def get_current_user(
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+@lru_cache(maxsize=256)
 def require_permission(permission: str):
     """
     Factory for permission-checking dependency.
     
+    Memoized so every route guarded by the same permission shares one
+    dependency callable.
+    
     Usage:
         @router.get("/admin", dependencies=[Depends(require_permission("admin"))])
     """
     async def check_permission(current_user: CurrentUser) -> User:
-        if not current_user.has_permission(permission):
+        if permission not in current_user.permission_set:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission denied: {permission} required",
@@ -92,14 +102,16 @@ def require_permission(permission: str):
     return check_permission
 
 
+@lru_cache(maxsize=256)
 def require_any_permission(*permissions: str):
     """
     Factory for checking if user has any of the specified permissions.
     """
+    required = frozenset(permissions)
+    
     async def check_permissions(current_user: CurrentUser) -> User:
-        for permission in permissions:
-            if current_user.has_permission(permission):
-                return current_user
+        if not required.isdisjoint(current_user.permission_set):
+            return current_user
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Permission denied: one of {permissions} required",
@@ -7,12 +7,13 @@ in real-time using Server-Sent Events.
 """
 
 import asyncio
-import json
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, AsyncGenerator
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,14 +29,25 @@ class Event:
     data: dict[str, Any]
     timestamp: datetime = field(default_factory=_utc_now)
     
-    def to_sse(self) -> str:
-        """Format event for SSE transmission."""
+    def to_sse(self) -> bytes:
+        """Format event as an SSE frame (orjson emits the timestamp as ISO 8601)."""
         payload: dict[str, Any] = {
             "type": self.event_type,
             "data": self.data,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.timestamp,
         }
-        return f"data: {json.dumps(payload)}\n\n"
+        return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+_KEEPALIVE_FRAME = b": keepalive\n\n"
+
+# Frames buffered per subscriber; a client this far behind loses its oldest
+# frames instead of growing the queue without bound.
+_SUBSCRIBER_QUEUE_SIZE = 256
+
+# Events broadcast within this window are fanned out together as one chunk.
+# Concatenated SSE frames are still parsed as separate events by clients.
+_COALESCE_WINDOW = 0.005
 
 
 class EventBroadcaster:
@@ -47,20 +59,24 @@ class EventBroadcaster:
     """
     
     def __init__(self) -> None:
-        self._subscribers: set[asyncio.Queue[Event]] = set()
-        self._lock = asyncio.Lock()
+        # Copy-on-write: subscribe/unsubscribe swap in a new tuple, so broadcast
+        # can iterate a snapshot without locking. Each swap has no await in it,
+        # which makes it atomic on the event loop.
+        self._subscribers: tuple[asyncio.Queue[bytes], ...] = ()
+        self._dropped = 0
+        self._pending: list[bytes] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
     
-    async def subscribe(self) -> AsyncGenerator[str, None]:
+    async def subscribe(self) -> AsyncGenerator[bytes, None]:
         """
         Subscribe to events.
         
-        Yields SSE-formatted event strings as they arrive.
+        Yields SSE frames as they arrive.
         """
-        queue: asyncio.Queue[Event] = asyncio.Queue()
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
         
-        async with self._lock:
-            self._subscribers.add(queue)
-            logger.info(f"New subscriber connected. Total: {len(self._subscribers)}")
+        self._subscribers = self._subscribers + (queue,)
+        logger.info("New subscriber connected. Total: %s", len(self._subscribers))
         
         try:
             # Send initial connection event
@@ -72,41 +88,69 @@ class EventBroadcaster:
             while True:
                 try:
                     # Wait for events with a timeout to send keepalive
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield event.to_sse()
+                    yield await asyncio.wait_for(queue.get(), timeout=30.0)
                 except asyncio.TimeoutError:
                     # Send keepalive comment to prevent connection timeout
-                    yield ": keepalive\n\n"
+                    yield _KEEPALIVE_FRAME
         except asyncio.CancelledError:
             logger.info("Subscriber connection cancelled")
             raise
         finally:
-            async with self._lock:
-                self._subscribers.discard(queue)
-                logger.info(f"Subscriber disconnected. Total: {len(self._subscribers)}")
+            self._subscribers = tuple(q for q in self._subscribers if q is not queue)
+            logger.info("Subscriber disconnected. Total: %s", len(self._subscribers))
     
-    async def broadcast(self, event: Event) -> int:
+    async def broadcast(self, event: Event, *, immediate: bool = False) -> int:
         """
         Broadcast an event to all subscribers.
         
-        Returns the number of subscribers that received the event.
-        """
-        async with self._lock:
-            subscribers = list(self._subscribers)
+        Events are coalesced with others sent in the next few milliseconds
+        unless immediate is set, which also flushes anything pending first so
+        ordering is preserved.
         
+        Returns the number of subscribers that will receive the event.
+        """
+        subscribers = self._subscribers
         if not subscribers:
             return 0
         
-        count = 0
-        for queue in subscribers:
+        # Encode once; every subscriber receives the same frame
+        self._pending.append(event.to_sse())
+        if immediate:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                _COALESCE_WINDOW, self._flush
+            )
+        
+        logger.info("Broadcast '%s' to %s subscribers", event.event_type, len(subscribers))
+        return len(subscribers)
+    
+    def _flush(self) -> None:
+        """Fan out all pending frames as a single chunk per subscriber."""
+        self._flush_handle = None
+        frames, self._pending = self._pending, []
+        if not frames:
+            return
+        
+        chunk = frames[0] if len(frames) == 1 else b"".join(frames)
+        dropped = 0
+        for queue in self._subscribers:
             try:
-                queue.put_nowait(event)
-                count += 1
+                queue.put_nowait(chunk)
             except asyncio.QueueFull:
-                logger.warning("Subscriber queue full, event dropped")
+                # Drop-oldest: a slow client keeps receiving the newest frames
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                queue.put_nowait(chunk)
+                dropped += 1
         
-        logger.info(f"Broadcast '{event.event_type}' to {count} subscribers")
-        return count
+        if dropped:
+            self._dropped += dropped
+            logger.warning("Dropped oldest frame for %s slow subscribers", dropped)
     
     async def broadcast_request_item_created(self, item_data: dict[str, Any]) -> int:
         """Broadcast a new request item creation event."""
@@ -122,12 +166,17 @@ class EventBroadcaster:
             event_type="request_item_supplied",
             data={"item_id": item_id, "part_number": part_number},
         )
-        return await self.broadcast(event)
+        return await self.broadcast(event, immediate=True)
     
     @property
     def subscriber_count(self) -> int:
         """Get the current number of subscribers."""
         return len(self._subscribers)
+    
+    @property
+    def dropped_count(self) -> int:
+        """Get the total number of frames dropped for slow subscribers."""
+        return self._dropped
 
 
 # Global broadcaster instance
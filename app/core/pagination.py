@@ -0,0 +1,70 @@
+"""Keyset (seek) pagination cursors and paginated page helpers."""
+
+import base64
+import binascii
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises HTTPException 400 if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+async def fetch_page_with_total(
+    db: AsyncSession,
+    stmt: Select[Any],
+    count_stmt: Select[Any],
+    offset: int,
+    *,
+    scalars: bool = True,
+) -> tuple[Sequence[Any], int]:
+    """
+    Fetch one offset page of entities together with the total match count.
+    
+    The total rides along as count(*) OVER () on the page scan; only a page
+    past the end (no row to carry it) falls back to count_stmt. With
+    scalars=False column rows are returned whole (carrying an extra total).
+    """
+    rows = (await db.execute(stmt.add_columns(func.count().over().label("total")).offset(offset))).all()
+    if rows:
+        return [row[0] for row in rows] if scalars else rows, rows[0].total
+    if offset == 0:
+        return [], 0
+    return [], (await db.execute(count_stmt)).scalar_one()
+
+
+def page_response(page: BaseModel) -> Response:
+    """
+    Send an already-validated page model as JSON.
+    
+    Returning a Response skips FastAPI's response_model re-validation and
+    jsonable_encoder pass; the route's response_model still documents the shape.
+    """
+    return Response(content=page.model_dump_json(), media_type=ORJSONResponse.media_type)
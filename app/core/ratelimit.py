@@ -1,14 +1,12 @@
 """Rate limiting middleware using in-memory storage."""
 
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import Awaitable, Callable
 
-from fastapi import Request, Response, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+import orjson
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
 @dataclass
@@ -27,30 +25,33 @@ class InMemoryRateLimiter:
     """
     
     def __init__(self):
-        self._requests: dict[str, list[float]] = defaultdict(list)
-    
-    def _cleanup_old_requests(self, key: str, window_seconds: float) -> None:
-        """Remove requests older than the window."""
-        now = time.time()
-        cutoff = now - window_seconds
-        self._requests[key] = [t for t in self._requests[key] if t > cutoff]
+        # Timestamps are appended in order, so expired ones are always at the left
+        self._requests: defaultdict[str, deque[float]] = defaultdict(deque)
     
     def is_allowed(self, key: str, max_requests: int, window_seconds: float) -> bool:
         """Check if request is allowed under rate limit."""
-        self._cleanup_old_requests(key, window_seconds)
+        # Read the clock once; monotonic is immune to wall-clock adjustments
+        now = time.monotonic()
+        timestamps = self._requests[key]
+        
+        # Remove requests older than the window
+        cutoff = now - window_seconds
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
         
-        if len(self._requests[key]) >= max_requests:
+        if len(timestamps) >= max_requests:
             return False
         
-        self._requests[key].append(time.time())
+        timestamps.append(now)
         return True
     
     def get_retry_after(self, key: str, window_seconds: float) -> int:
         """Get seconds until the oldest request expires."""
-        if not self._requests[key]:
+        timestamps = self._requests.get(key)
+        if not timestamps:
             return 0
-        oldest = min(self._requests[key])
-        retry_after = int(window_seconds - (time.time() - oldest)) + 1
+        oldest = timestamps[0]
+        retry_after = int(window_seconds - (time.monotonic() - oldest)) + 1
         return max(0, retry_after)
 
 
@@ -58,77 +59,103 @@ class InMemoryRateLimiter:
 rate_limiter = InMemoryRateLimiter()
 
 
-def get_client_ip(request: Request) -> str:
-    """Extract client IP from request, handling proxies."""
+def get_client_ip(scope: Scope) -> str:
+    """Extract client IP from an ASGI scope, handling proxies."""
+    forwarded = real_ip = None
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            forwarded = value
+        elif name == b"x-real-ip":
+            real_ip = value
+    
     # Check X-Forwarded-For header first (for reverse proxies)
-    forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
-        return forwarded.split(",")[0].strip()
+        return forwarded.split(b",")[0].strip().decode("latin-1")
     
     # Check X-Real-IP header
-    real_ip = request.headers.get("X-Real-IP")
     if real_ip:
-        return real_ip
+        return real_ip.decode("latin-1")
     
     # Fall back to direct client IP
-    if request.client:
-        return request.client.host
+    client = scope.get("client")
+    if client:
+        return client[0]
     
     return "unknown"
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+# Skip rate limiting for health checks and docs
+_SKIP_PATHS = frozenset({"/health", "/", "/docs", "/redoc", "/openapi.json"})
+
+
+class RateLimitMiddleware:
     """
     Rate limiting middleware with different limits for different endpoints.
+    
+    Plain ASGI middleware: allowed requests are passed straight through and
+    rejected ones get a 429 without building a Request or Response object.
     """
     
     def __init__(self, app: ASGIApp, config: RateLimitConfig | None = None):
-        super().__init__(app)
+        self.app = app
         self.config = config or RateLimitConfig()
+        # Each worker process keeps its own counters and enforces the full
+        # limits, so with several workers the effective per-client limit is
+        # approximate (up to workers x the configured values, depending on how
+        # requests are spread). Move the limiter to Redis for exact limits.
+        self.requests_per_second = self.config.requests_per_second
+        self.requests_per_minute = self.config.requests_per_minute
+        self.auth_requests_per_minute = self.config.auth_requests_per_minute
     
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        # Skip rate limiting for health checks and docs
-        path = request.url.path
-        if path in ("/health", "/", "/docs", "/redoc", "/openapi.json"):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        if path in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        client_ip = get_client_ip(request)
+        client_ip = get_client_ip(scope)
         
         # Stricter rate limiting for auth endpoints (per-minute)
         if path.startswith("/auth"):
             key_prefix = f"auth:{client_ip}"
-            max_per_minute = self.config.auth_requests_per_minute
+            max_per_minute = self.auth_requests_per_minute
         else:
             key_prefix = f"api:{client_ip}"
-            max_per_minute = self.config.requests_per_minute
+            max_per_minute = self.requests_per_minute
 
         # Enforce per-second and per-minute limits.
         # Note: we reuse requests_per_second for both auth and non-auth to avoid
         # expanding the config surface area.
         per_second_key = f"{key_prefix}:sec"
-        if not rate_limiter.is_allowed(per_second_key, self.config.requests_per_second, 1.0):
-            retry_after = rate_limiter.get_retry_after(per_second_key, 1.0)
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "detail": "Rate limit exceeded",
-                    "retry_after": retry_after,
-                },
-                headers={"Retry-After": str(retry_after)},
-            )
+        if not rate_limiter.is_allowed(per_second_key, self.requests_per_second, 1.0):
+            await _send_rate_limited(send, rate_limiter.get_retry_after(per_second_key, 1.0))
+            return
 
         per_minute_key = f"{key_prefix}:min"
         if not rate_limiter.is_allowed(per_minute_key, max_per_minute, 60.0):
-            retry_after = rate_limiter.get_retry_after(per_minute_key, 60.0)
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "detail": "Rate limit exceeded",
-                    "retry_after": retry_after,
-                },
-                headers={"Retry-After": str(retry_after)},
-            )
+            await _send_rate_limited(send, rate_limiter.get_retry_after(per_minute_key, 60.0))
+            return
         
-        return await call_next(request)
+        await self.app(scope, receive, send)
+
+
+async def _send_rate_limited(send: Send, retry_after: int) -> None:
+    """Send a 429 JSON response directly over ASGI."""
+    body = orjson.dumps({
+        "detail": "Rate limit exceeded",
+        "retry_after": retry_after,
+    })
+    await send({
+        "type": "http.response.start",
+        "status": status.HTTP_429_TOO_MANY_REQUESTS,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
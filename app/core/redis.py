@@ -0,0 +1,26 @@
+"""Shared Redis client for the parts pick queue."""
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# One bounded pool per worker. A blocking pool makes bursts wait for a free
+# connection instead of opening new ones (or failing) past the limit; gateways
+# long-polling the pick queue each hold a connection while they wait.
+# Keepalive lets the OS notice pooled connections a NAT or proxy has dropped.
+# The read timeout must outlast the pick queue's 25s XREADGROUP BLOCK, or
+# every empty long poll would fail as a socket timeout.
+redis_pool = redis.BlockingConnectionPool.from_url(
+    settings.redis_url,
+    max_connections=settings.redis_max_connections,
+    socket_keepalive=True,
+    socket_timeout=30,
+    decode_responses=True,
+)
+redis_client: redis.Redis = redis.Redis(connection_pool=redis_pool)
+
+
+async def close_redis() -> None:
+    """Close the client and every pooled connection (called on shutdown)."""
+    await redis_client.aclose()
+    await redis_pool.aclose()
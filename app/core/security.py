@@ -1,25 +1,38 @@
 """Security utilities for password hashing and JWT token generation."""
 
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from jose import JWTError, jwk, jwt
 
+from app.core.cache import TTLLRUCache
 from app.core.config import settings
 
-# Password hashing context - using argon2 for better security
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2 hasher used directly; passlib's CryptContext only added scheme
+# identification overhead on every call for our single-scheme setup.
+_password_hasher = PasswordHasher()
 
 
 def hash_password(password: str) -> str:
     """Hash a password using Argon2."""
-    return pwd_context.hash(password)
+    return _password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return _password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+# HMAC keys built once; passing a Key skips jose's per-call JSON probe and
+# jwk.construct on every encode/decode.
+_ACCESS_KEY = jwk.construct(settings.secret_key, settings.jwt_algorithm)
 
 
 def create_access_token(user_id: str, expires_hours: int | None = None) -> str:
@@ -29,34 +42,62 @@ def create_access_token(user_id: str, expires_hours: int | None = None) -> str:
 
     expire = datetime.now(timezone.utc) + timedelta(hours=expires_hours)
     payload: dict[str, Any] = {"sub": user_id, "exp": expire}
-    token = jwt.encode(payload, settings.secret_key, algorithm=settings.jwt_algorithm)
+    token = jwt.encode(payload, _ACCESS_KEY, algorithm=settings.jwt_algorithm)
     return token
 
 
-def verify_token(token: str) -> str | None:
-    """Verify and decode a JWT token. Returns user_id if valid, None if invalid."""
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
-        user_id: str | None = payload.get("sub")
+def token_digest(token: str) -> bytes:
+    """Cache key for a bearer token, so raw tokens are never held in memory."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+# Successful decodes only, as (user_id, exp), keyed by token_digest; an entry
+# never outlives its token, and invalid tokens are re-checked every time
+_access_token_cache: TTLLRUCache[bytes, tuple[str, float]] = TTLLRUCache(maxsize=8192, ttl_seconds=300.0)
+
+
+def decode_token_claims(token: str) -> tuple[str, float] | None:
+    """Verify a JWT and return its (user_id, exp), or None if invalid or expired."""
+    key = token_digest(token)
+    claims = _access_token_cache.get(key)
+    if claims is None:
+        try:
+            # Tokens without exp are rejected; every cached entry needs a lifetime
+            payload = jwt.decode(
+                token, _ACCESS_KEY, algorithms=[settings.jwt_algorithm], options={"require_exp": True}
+            )
+        except JWTError:
+            return None
+        user_id = payload.get("sub")
         if user_id is None:
             return None
-        return user_id
-    except JWTError:
+        claims = (user_id, float(payload["exp"]))
+        _access_token_cache.set(key, claims, ttl_seconds=claims[1] - time.time())
+    # The signature check is cached; expiry is still checked on every call
+    if claims[1] <= time.time():
         return None
+    return claims
+
+
+def verify_token(token: str) -> str | None:
+    """Verify and decode a JWT token. Returns user_id if valid, None if invalid."""
+    claims = decode_token_claims(token)
+    return claims[0] if claims is not None else None
 
 
 # Refresh token config
 REFRESH_SECRET_KEY = getattr(settings, "REFRESH_SECRET_KEY", "refresh_secret")
 REFRESH_TOKEN_EXPIRE_MINUTES = getattr(settings, "REFRESH_TOKEN_EXPIRE_MINUTES", 43200)
+_REFRESH_KEY = jwk.construct(REFRESH_SECRET_KEY, "HS256")
 
 def create_refresh_token(subject: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
     payload: dict[str, Any] = {"sub": subject, "exp": expire}
-    return jwt.encode(payload, REFRESH_SECRET_KEY, algorithm="HS256")
+    return jwt.encode(payload, _REFRESH_KEY, algorithm="HS256")
 
 def verify_refresh_token(token: str) -> str | None:
     try:
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, _REFRESH_KEY, algorithms=["HS256"])
         user_id: str | None = payload.get("sub")
         if user_id is None:
             return None
@@ -0,0 +1,40 @@
+"""Stock movement rows shared by the receiving and outgoing routes."""
+
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+from app.models import OutgoingItem, ReceivingItem
+
+
+def chain_movement_rows(
+    items: Iterable[ReceivingItem | OutgoingItem],
+    stock_before: dict[UUID, int],
+    movement_type: str,
+    reference_type: str,
+    reference_id: UUID,
+) -> list[dict[str, Any]]:
+    """
+    Build PartMovement insert rows for a document's line items, in line order.
+
+    stock_before maps each part to its stock before the document; a part that
+    repeats chains its stock_before/after from the previous line. created_at
+    is left to the server default: clock_timestamp() is evaluated per row, so
+    one bulk INSERT still stamps the lines in order under (created_at, id).
+    """
+    sign = 1 if movement_type == "in" else -1
+    stock = dict(stock_before)
+    rows = []
+    for item in items:
+        before = stock[item.part_id]
+        stock[item.part_id] = before + sign * item.qty
+        rows.append({
+            "part_id": item.part_id,
+            "stock_before": before,
+            "type": movement_type,
+            "qty": item.qty,
+            "stock_after": stock[item.part_id],
+            "reference_type": reference_type,
+            "reference_id": reference_id,
+        })
+    return rows
@@ -4,21 +4,26 @@ import logging
 import sys
 import time
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Any, AsyncGenerator, Awaitable, Callable
 from ipaddress import ip_address, ip_network
 
+import orjson
+
 from fastapi import APIRouter, FastAPI, Request, Response, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.responses import ORJSONResponse
 
 from sqlalchemy import text
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 from app.core.database import engine
 from app.core.ratelimit import RateLimitMiddleware, RateLimitConfig
+from app.core.redis import close_redis
 from app.api.v1.shared import auth, users
 from app.api.v1.inventory import (
     dashboard,
@@ -62,15 +67,31 @@ if settings.is_production:
     logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
 
 
+def _cidr_table(cidrs: list[str]) -> tuple[tuple[int, int], ...]:
+    """(netmask, network) integer pairs for each CIDR range."""
+    return tuple(
+        (int(net.netmask), int(net.network_address))
+        for net in map(ip_network, cidrs)
+    )
+
+
+# Parsed once at import; with ~15 ranges per family a linear scan of integer
+# mask-and-compare beats bisecting on constant factors
+_CF_V4 = _cidr_table(CLOUDFLARE_IPV4)
+_CF_V6 = _cidr_table(CLOUDFLARE_IPV6)
+
+
+@lru_cache(maxsize=4096)
 def is_cloudflare_ip(ip: str) -> bool:
     """Check if IP is from Cloudflare network."""
     try:
         addr = ip_address(ip)
-        ranges = CLOUDFLARE_IPV4 if addr.version == 4 else CLOUDFLARE_IPV6
-        return any(addr in ip_network(cidr) for cidr in ranges)
     except ValueError:
-        logger.warning(f"Invalid IP address: {ip}")
+        logger.warning("Invalid IP address: %s", ip)
         return False
+    table = _CF_V4 if addr.version == 4 else _CF_V6
+    addr_int = int(addr)
+    return any(addr_int & mask == network for mask, network in table)
 
 
 async def verify_database_connection() -> bool:
@@ -81,7 +102,7 @@ async def verify_database_connection() -> bool:
         logger.info("? Database connection verified")
         return True
     except Exception as e:
-        logger.error(f"? Database connection failed: {e}")
+        logger.error("? Database connection failed: %s", e)
         return False
 
 
@@ -90,9 +111,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Manage app startup and shutdown events."""
     # Startup
     logger.info("=" * 60)
-    logger.info(f"?? Starting {settings.app_name}...")
-    logger.info(f"   Environment: {settings.environment.upper()}")
-    logger.info(f"   Version: {settings.app_version}")
+    logger.info("?? Starting %s...", settings.app_name)
+    logger.info("   Environment: %s", settings.environment.upper())
+    logger.info("   Version: %s", settings.app_version)
     
     # Verify database connection
     db_ok = await verify_database_connection()
@@ -101,16 +122,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     
     # Log configuration
     logger.info("?? Configuration:")
-    logger.info(f"   Debug Mode: {settings.debug}")
-    logger.info(f"   API Domain: {settings.api_domain}")
-    logger.info(f"   Frontend Domain: {settings.frontend_domain}")
-    logger.info(f"   CORS Origins: {settings.allowed_origins_list}")
-    logger.info(f"   Cloudflare Validation: {settings.should_validate_cloudflare}")
-    logger.info(f"   Rate Limiting: {settings.rate_limit_enabled}")
+    logger.info("   Debug Mode: %s", settings.debug)
+    logger.info("   API Domain: %s", settings.api_domain)
+    logger.info("   Frontend Domain: %s", settings.frontend_domain)
+    logger.info("   CORS Origins: %s", settings.allowed_origins_list)
+    logger.info("   Cloudflare Validation: %s", settings.should_validate_cloudflare)
+    logger.info("   Rate Limiting: %s", settings.rate_limit_enabled)
     
     if settings.is_development:
-        logger.info(f"?? API Docs: http://localhost:{settings.port}/docs")
-        logger.info(f"?? Debug Info: http://localhost:{settings.port}/info")
+        logger.info("?? API Docs: http://localhost:%s/docs", settings.port)
+        logger.info("?? Debug Info: http://localhost:%s/info", settings.port)
     
     logger.info("=" * 60)
     
@@ -118,8 +139,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     
     # Shutdown
     logger.info("=" * 60)
-    logger.info(f"?? Shutting down {settings.app_name}...")
+    logger.info("?? Shutting down %s...", settings.app_name)
     await engine.dispose()
+    await close_redis()
     logger.info("? Resources cleaned up")
     logger.info("=" * 60)
 
@@ -158,7 +180,12 @@ app.add_middleware(
 )
 
 # 3. GZip Middleware (Compress responses - backup to Caddy)
-app.add_middleware(GZipMiddleware, minimum_size=500)
+# Behind Cloudflare/Caddy the edge re-encodes with brotli/zstd anyway, so
+# origin-side gzip would only burn CPU on every response. Level 5 keeps most
+# of level 9's ratio on repetitive JSON (e.g. the streamed Sheets sync) at a
+# fraction of the CPU.
+if not settings.cloudflare_enabled:
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # 4. Rate Limiting Middleware (Apply rate limits)
 if settings.rate_limit_enabled:
@@ -172,54 +199,86 @@ if settings.rate_limit_enabled:
     )
 
 # 5. Cloudflare/IP extraction middleware
-@app.middleware("http")
-async def cloudflare_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
+_CF_HEADERS = frozenset({
+    b"cf-connecting-ip", b"x-real-ip", b"x-forwarded-for",
+    b"cf-ray", b"cf-ipcountry", b"cf-visitor", b"host",
+})
+_ENVIRONMENT_HEADERS = [
+    (b"x-environment", settings.environment.encode("latin-1")),
+    (b"x-api-version", settings.app_version.encode("latin-1")),
+]
+
+
+class CloudflareMiddleware:
     """
     Extract real client IP and Cloudflare metadata.
     Validate requests are from Cloudflare in production.
+    
+    Plain ASGI middleware: headers are read in one pass over the raw scope
+    and results are written to scope["state"], which backs request.state.
     """
-    proxy_ip = request.client.host if request.client else "unknown"
-
-    if settings.should_validate_cloudflare and proxy_ip != "unknown":
-        if not is_cloudflare_ip(proxy_ip):
-            logger.warning(
-                f"??  Request NOT from Cloudflare: {proxy_ip} "
-                f"(Host: {request.headers.get('host', 'unknown')})"
-            )
-
-    cf_connecting_ip = request.headers.get("CF-Connecting-IP")
-    x_real_ip = request.headers.get("X-Real-IP")
-    x_forwarded_for = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-
-    real_ip = cf_connecting_ip or x_real_ip or x_forwarded_for or proxy_ip
 
-    cf_ray = request.headers.get("CF-Ray", "N/A")
-    cf_country = request.headers.get("CF-IPCountry", "Unknown")
-    cf_visitor = request.headers.get("CF-Visitor", "{}")
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Settings are fixed after startup; bind them once instead of per request
+        self.validate_cloudflare = settings.should_validate_cloudflare
+        self.debug = settings.debug
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers: dict[bytes, str] = {}
+        for name, value in scope["headers"]:
+            if name in _CF_HEADERS and name not in headers:
+                headers[name] = value.decode("latin-1")
+        get_header = headers.get
+
+        client = scope.get("client")
+        proxy_ip = client[0] if client else "unknown"
+
+        if self.validate_cloudflare and proxy_ip != "unknown":
+            if not is_cloudflare_ip(proxy_ip):
+                logger.warning(
+                    "??  Request NOT from Cloudflare: %s (Host: %s)",
+                    proxy_ip,
+                    get_header(b"host", "unknown"),
+                )
+
+        # Fallbacks are only parsed when the preferred header is missing
+        cf_connecting_ip = get_header(b"cf-connecting-ip")
+        real_ip = cf_connecting_ip or get_header(b"x-real-ip")
+        if not real_ip:
+            real_ip = get_header(b"x-forwarded-for", "").split(",")[0].strip() or proxy_ip
+
+        cf_ray = get_header(b"cf-ray", "N/A")
+        cf_country = get_header(b"cf-ipcountry", "Unknown")
+
+        scope.setdefault("state", {}).update(
+            real_ip=real_ip,
+            proxy_ip=proxy_ip,
+            cf_ray=cf_ray,
+            cf_country=cf_country,
+            cf_visitor=get_header(b"cf-visitor", "{}"),
+            is_cloudflare=bool(cf_connecting_ip),
+        )
 
-    request.state.real_ip = real_ip
-    request.state.proxy_ip = proxy_ip
-    request.state.cf_ray = cf_ray
-    request.state.cf_country = cf_country
-    request.state.cf_visitor = cf_visitor
-    request.state.is_cloudflare = bool(cf_connecting_ip)
+        if self.debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Request: %s %s | Real IP: %s | Country: %s | CF-Ray: %s",
+                scope["method"], scope["path"], real_ip, cf_country, cf_ray,
+            )
 
-    if settings.debug:
-        logger.debug(
-            f"Request: {request.method} {request.url.path} | "
-            f"Real IP: {real_ip} | Country: {cf_country} | "
-            f"CF-Ray: {cf_ray}"
-        )
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *_ENVIRONMENT_HEADERS]
+            await send(message)
 
-    response = await call_next(request)
+        await self.app(scope, receive, send_with_headers)
 
-    response.headers["X-Environment"] = settings.environment
-    response.headers["X-API-Version"] = settings.app_version
 
-    return response
+app.add_middleware(CloudflareMiddleware)
 
 # 6. Request Timing Middleware (Log slow requests)
 @app.middleware("http")
@@ -244,33 +303,44 @@ async def request_timing_middleware(
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
-) -> JSONResponse:
+) -> Response:
     """Handle validation errors with structured response."""
     logger.warning(
-        f"Validation error from {request.state.real_ip} "
-        f"[{request.method} {request.url.path}]: {exc.errors()}"
+        "Validation error from %s [%s %s]: %s",
+        request.state.real_ip,
+        request.method,
+        request.url.path,
+        exc.errors(),
     )
-    return JSONResponse(
+    # errors() may carry exception objects in "ctx"; stringify anything orjson can't encode
+    return Response(
+        content=orjson.dumps(
+            {
+                "detail": "Validation error",
+                "errors": exc.errors(),
+            },
+            default=str,
+        ),
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={
-            "detail": "Validation error",
-            "errors": exc.errors(),
-        },
+        media_type=ORJSONResponse.media_type,
     )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(
     request: Request, exc: Exception
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle unexpected errors."""
     logger.error(
-        f"Unexpected error from {request.state.real_ip} "
-        f"[CF-Ray: {request.state.cf_ray}] "
-        f"[{request.method} {request.url.path}]: {exc}",
+        "Unexpected error from %s [CF-Ray: %s] [%s %s]: %s",
+        request.state.real_ip,
+        request.state.cf_ray,
+        request.method,
+        request.url.path,
+        exc,
         exc_info=True,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "Internal server error",
@@ -312,48 +382,86 @@ app.include_router(api_v1)
 # ENDPOINTS
 # ============================================================================
 
+# Static bodies for the endpoints uptime monitors poll; settings are fixed
+# after import, so these are serialized once instead of on every hit.
+_ROOT_BODY = orjson.dumps({
+    "message": f"{settings.app_name} is running",
+    "status": "ok",
+    "version": settings.app_version,
+    "environment": settings.environment,
+    "docs": "/docs" if settings.is_development else "disabled",
+    "redoc": "/redoc" if settings.is_development else "disabled",
+})
+_PING_BODY = orjson.dumps({"message": "pong"})
+_HEALTHY_BODY = orjson.dumps({
+    "status": "healthy",
+    "database": "connected",
+    "version": settings.app_version,
+    "environment": settings.environment,
+})
+
+# Repeated /health probes within this window reuse the last result
+_HEALTH_PROBE_TTL = 1.0
+# Idle pooled connections count as proof of reachability only this long after
+# the last real round trip, so an outage still surfaces within a few probes
+_HEALTH_POOL_TRUST = 10.0
+_health_probe: tuple[float, str | None] = (float("-inf"), None)
+_last_roundtrip = float("-inf")
+
+
+async def _probe_database() -> str | None:
+    """Check the database, returning the error message or None if healthy."""
+    global _health_probe, _last_roundtrip
+    now = time.monotonic()
+    checked_at, error = _health_probe
+    if now - checked_at < _HEALTH_PROBE_TTL:
+        return error
+
+    if (
+        error is None
+        and now - _last_roundtrip < _HEALTH_POOL_TRUST
+        and getattr(engine.pool, "checkedin", lambda: 0)() > 0  # NullPool under PgBouncer keeps none
+    ):
+        _health_probe = (now, None)
+        return None
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        error = None
+        _last_roundtrip = time.monotonic()
+    except Exception as e:
+        error = str(e)
+    _health_probe = (time.monotonic(), error)
+    return error
+
+
 @app.get("/", response_class=ORJSONResponse, tags=["Root"])
-async def root(request: Request) -> dict[str, Any]:
+async def root() -> Response:
     """Root endpoint - API information."""
-    return {
-        "message": f"{settings.app_name} is running",
-        "status": "ok",
-        "version": settings.app_version,
-        "environment": settings.environment,
-        "docs": "/docs" if settings.is_development else "disabled",
-        "redoc": "/redoc" if settings.is_development else "disabled",
-    }
+    return Response(content=_ROOT_BODY, media_type=ORJSONResponse.media_type)
 
 
 @app.get("/health", response_class=ORJSONResponse, tags=["Health"])
-async def health_check(request: Request) -> dict[str, Any]:
+async def health_check() -> Response:
     """
     Health check endpoint for monitoring and load balancers.
     Returns database connection status.
     """
-    try:
-        async with engine.connect() as conn:
-            await conn.execute(text("SELECT 1"))
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "version": settings.app_version,
-            "environment": settings.environment,
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        # Set status code via response_class, but return a dict
-        # FastAPI will serialize and set status code if you raise HTTPException
-        from fastapi import HTTPException
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={
-                "status": "unhealthy",
-                "database": "disconnected",
-                "error": str(e) if settings.debug else "Database connection failed",
-            },
-        )
+    error = await _probe_database()
+    if error is None:
+        return Response(content=_HEALTHY_BODY, media_type=ORJSONResponse.media_type)
+
+    logger.error("Health check failed: %s", error)
+    from fastapi import HTTPException
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "status": "unhealthy",
+            "database": "disconnected",
+            "error": error if settings.debug else "Database connection failed",
+        },
+    )
 
 
 @app.get("/info", response_class=ORJSONResponse, tags=["Debug"])
@@ -395,6 +503,6 @@ async def server_info(request: Request) -> dict[str, Any]:
 
 
 @app.get("/ping", response_class=ORJSONResponse, tags=["Health"])
-async def ping() -> dict[str, str]:
+async def ping() -> Response:
     """Simple ping endpoint for uptime monitoring."""
-    return {"message": "pong"}
\ No newline at end of file
+    return Response(content=_PING_BODY, media_type=ORJSONResponse.media_type)
\ No newline at end of file
@@ -1,15 +1,25 @@
 """SQLAlchemy ORM models for all resources."""
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime
 from uuid import UUID as PyUUID
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy import Boolean, ColumnElement, Computed, DateTime, ForeignKey, Index, Integer, String, Text, func, select, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from app.core.config import now_jakarta
 
+# DB-side ids for raw SQL/bulk writers that omit them. The ORM still sets ids
+# client-side: a server-generated UUID can't order RETURNING rows, so
+# multi-row flushes would fall back to one INSERT per row.
+_GEN_UUID = text("gen_random_uuid()")
+
+# Server-side equivalent of now_jakarta(): naive Asia/Jakarta wall-clock time,
+# read per row (now() would give every row the transaction's start time)
+_NOW_JAKARTA = text("(clock_timestamp() AT TIME ZONE 'Asia/Jakarta')")
+
 
 class Base(DeclarativeBase):
     pass
@@ -22,7 +32,7 @@ class SoftDeleteMixin:
     
     def soft_delete(self) -> None:
         """Mark the record as deleted."""
-        self.deleted_at = datetime.now(timezone.utc)
+        self.deleted_at = now_jakarta()
     
     @property
     def is_deleted(self) -> bool:
@@ -41,27 +51,42 @@ class User(TimestampMixin, Base):
     """User model with permissions and 2FA support."""
 
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_permissions_gin", "permissions", postgresql_using="gin"),
+    )
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     password: Mapped[str] = mapped_column(String(255), nullable=False)
     role: Mapped[str] = mapped_column(String(50), nullable=False, default="inventory")
-    permissions: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
-    two_factor_secret: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    two_factor_recovery_codes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    permissions: Mapped[list[str]] = mapped_column(JSONB, default=list, nullable=False)
+    # Secrets no request path reads: left out of every SELECT, and touching
+    # them without undefer() raises instead of emitting a lazy load
+    two_factor_secret: Mapped[str | None] = mapped_column(String(255), nullable=True, deferred=True, deferred_raiseload=True)
+    two_factor_recovery_codes: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_raiseload=True)
     two_factor_confirmed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     email_verified_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    remember_token: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    remember_token: Mapped[str | None] = mapped_column(String(255), nullable=True, deferred=True, deferred_raiseload=True)
 
     # Relationships
     receivings: Mapped[list["Receiving"]] = relationship("Receiving", back_populates="received_by_user", foreign_keys="Receiving.received_by")
     outgoings: Mapped[list["Outgoing"]] = relationship("Outgoing", back_populates="issued_by_user", foreign_keys="Outgoing.issued_by")
     requests: Mapped[list["Request"]] = relationship("Request", back_populates="requested_by_user", foreign_keys="Request.requested_by")
 
+    @property
+    def permission_set(self) -> frozenset[str]:
+        """Permissions as a frozenset, rebuilt only when the list is replaced."""
+        permissions = self.permissions
+        cached = self.__dict__.get("_permission_set")
+        if cached is None or cached[0] is not permissions:
+            cached = (permissions, frozenset(permissions))
+            self.__dict__["_permission_set"] = cached
+        return cached[1]
+
     def has_permission(self, permission: str) -> bool:
         """Check if user has a specific permission."""
-        return permission in self.permissions
+        return permission in self.permission_set
 
 
 class Part(SoftDeleteMixin, TimestampMixin, Base):
@@ -70,11 +95,17 @@ class Part(SoftDeleteMixin, TimestampMixin, Base):
     __tablename__ = "parts"
     __table_args__ = (
         Index("ix_parts_part_number", "part_number"),
-        Index("ix_parts_deleted_at", "deleted_at"),
         Index("ix_parts_is_active", "is_active"),
+        Index("ix_parts_active_stock", "stock", "is_active", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_parts_stock_status", "stock_status", "stock", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_parts_active_created", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_parts_search_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
     )
+    # Fetch the generated stock_status via RETURNING on insert/update instead of
+    # expiring it (an expired attribute can't lazy-load under asyncio)
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     part_number: Mapped[str] = mapped_column(String(255), nullable=False)
     part_name: Mapped[str] = mapped_column(String(255), nullable=False)
     customer_code: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -85,22 +116,32 @@ class Part(SoftDeleteMixin, TimestampMixin, Base):
     stock: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     address: Mapped[str | None] = mapped_column(String(255), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Stock status computed by PostgreSQL from stock: in_stock, low_stock, out_of_stock
+    stock_status: Mapped[str] = mapped_column(
+        String(16),
+        Computed(
+            "CASE WHEN stock <= 0 THEN 'out_of_stock' "
+            "WHEN stock <= 10 THEN 'low_stock' ELSE 'in_stock' END",
+            persisted=True,
+        ),
+    )
+    # Searchable codes/names in one trigram-indexed column; never loaded by default
+    search_text: Mapped[str] = mapped_column(
+        Text,
+        Computed(
+            "part_number || ' | ' || part_name || ' | ' || coalesce(customer_code, '') || ' | ' "
+            "|| coalesce(supplier_code, '') || ' | ' || coalesce(model, '')",
+            persisted=True,
+        ),
+        deferred=True,
+        deferred_raiseload=True,
+    )
 
     # Relationships
     receiving_items: Mapped[list["ReceivingItem"]] = relationship("ReceivingItem", back_populates="part")
     outgoing_items: Mapped[list["OutgoingItem"]] = relationship("OutgoingItem", back_populates="part")
     movements: Mapped[list["PartMovement"]] = relationship("PartMovement", back_populates="part")
 
-    @property
-    def stock_status(self) -> str:
-        """Compute stock status based on current stock level."""
-        if self.stock <= 0:
-            return "out_of_stock"
-        elif self.stock <= 10:
-            return "low_stock"
-        else:
-            return "in_stock"
-
     def has_transactions(self) -> bool:
         """Check if part exists in any ReceivingItems or OutgoingItems."""
         return len(self.receiving_items) > 0 or len(self.outgoing_items) > 0
@@ -112,11 +153,13 @@ class Receiving(SoftDeleteMixin, TimestampMixin, Base):
     __tablename__ = "receivings"
     __table_args__ = (
         Index("ix_receivings_doc_number", "doc_number"),
+        Index("ix_receivings_doc_number_trgm", "doc_number", postgresql_using="gin", postgresql_ops={"doc_number": "gin_trgm_ops"}),
         Index("ix_receivings_status", "status"),
-        Index("ix_receivings_deleted_at", "deleted_at"),
+        Index("ix_receivings_active_created", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_receivings_active_status_gr", "status", "is_gr", postgresql_where=text("deleted_at IS NULL")),
     )
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     doc_number: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     received_by: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     received_at: Mapped[datetime] = mapped_column(DateTime, default=now_jakarta, nullable=False)
@@ -137,18 +180,28 @@ class Receiving(SoftDeleteMixin, TimestampMixin, Base):
         """Check if receiving can be confirmed as GR."""
         return self.status == "completed" and not self.is_gr
 
-    @property
+    @hybrid_property
     def total_items(self) -> int:
         """Compute total quantity of items in this receiving."""
         return sum(item.qty for item in self.items)
 
+    @total_items.inplace.expression
+    @classmethod
+    def _total_items_expression(cls) -> ColumnElement[int]:
+        """Correlated SUM over the items, so list queries never load line rows."""
+        return (
+            select(func.coalesce(func.sum(ReceivingItem.qty), 0))
+            .where(ReceivingItem.receiving_id == cls.id)
+            .scalar_subquery()
+        )
+
 
 class ReceivingItem(TimestampMixin, Base):
     """Line item for a Receiving."""
 
     __tablename__ = "receiving_items"
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     receiving_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("receivings.id"), nullable=False)
     part_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("parts.id"), nullable=False)
     qty: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -164,11 +217,14 @@ class Outgoing(SoftDeleteMixin, TimestampMixin, Base):
     __tablename__ = "outgoings"
     __table_args__ = (
         Index("ix_outgoings_doc_number", "doc_number"),
+        Index("ix_outgoings_doc_number_trgm", "doc_number", postgresql_using="gin", postgresql_ops={"doc_number": "gin_trgm_ops"}),
         Index("ix_outgoings_status", "status"),
-        Index("ix_outgoings_deleted_at", "deleted_at"),
+        Index("ix_outgoings_active_created", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_outgoings_active_status_gi", "status", "is_gi", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_outgoings_active_status_created", "status", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
     )
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     doc_number: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     issued_by: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     issued_at: Mapped[datetime] = mapped_column(DateTime, default=now_jakarta, nullable=False)
@@ -189,18 +245,28 @@ class Outgoing(SoftDeleteMixin, TimestampMixin, Base):
         """Check if outgoing can be confirmed as GI."""
         return self.status == "completed" and not self.is_gi
 
-    @property
+    @hybrid_property
     def total_items(self) -> int:
         """Compute total quantity of items in this outgoing."""
         return sum(item.qty for item in self.items)
 
+    @total_items.inplace.expression
+    @classmethod
+    def _total_items_expression(cls) -> ColumnElement[int]:
+        """Correlated SUM over the items, so list queries never load line rows."""
+        return (
+            select(func.coalesce(func.sum(OutgoingItem.qty), 0))
+            .where(OutgoingItem.outgoing_id == cls.id)
+            .scalar_subquery()
+        )
+
 
 class OutgoingItem(TimestampMixin, Base):
     """Line item for an Outgoing."""
 
     __tablename__ = "outgoing_items"
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     outgoing_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("outgoings.id"), nullable=False)
     part_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("parts.id"), nullable=False)
     qty: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -216,11 +282,13 @@ class Request(SoftDeleteMixin, TimestampMixin, Base):
     __tablename__ = "requests"
     __table_args__ = (
         Index("ix_requests_request_number", "request_number"),
+        Index("ix_requests_request_number_trgm", "request_number", postgresql_using="gin", postgresql_ops={"request_number": "gin_trgm_ops"}),
         Index("ix_requests_status", "status"),
-        Index("ix_requests_deleted_at", "deleted_at"),
+        Index("ix_requests_active_created", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_requests_active_status_created", "status", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
     )
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     request_number: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     requested_by: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     requested_at: Mapped[datetime] = mapped_column(DateTime, default=now_jakarta, nullable=False)
@@ -238,7 +306,7 @@ class RequestList(TimestampMixin, Base):
 
     __tablename__ = "request_lists"
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     request_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("requests.id"), nullable=False)
     part_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("parts.id"), nullable=False)
     qty: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -255,12 +323,12 @@ class PartMovement(Base):
 
     __tablename__ = "part_movements"
     __table_args__ = (
-        Index("ix_part_movements_part_id", "part_id"),
+        Index("ix_part_movements_part_created", "part_id", text("created_at DESC"), text("id DESC")),
         Index("ix_part_movements_created_at", "created_at"),
         Index("ix_part_movements_reference", "reference_type", "reference_id"),
     )
 
-    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=_GEN_UUID)
     part_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), ForeignKey("parts.id"), nullable=False)
     stock_before: Mapped[int] = mapped_column(Integer, nullable=False)
     type: Mapped[str] = mapped_column(String(10), nullable=False)  # "in" or "out"
@@ -268,7 +336,8 @@ class PartMovement(Base):
     stock_after: Mapped[int] = mapped_column(Integer, nullable=False)
     reference_type: Mapped[str] = mapped_column(String(50), nullable=False)  # "Receivings" or "Outgoings"
     reference_id: Mapped[PyUUID] = mapped_column(UUID(as_uuid=True), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=now_jakarta, nullable=False)
+    # Stamped by Postgres so bulk inserts don't ship a timestamp per row
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=_NOW_JAKARTA, nullable=False)
 
     # Relationships
     part: Mapped["Part"] = relationship("Part", back_populates="movements")
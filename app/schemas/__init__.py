@@ -79,13 +79,16 @@ T = TypeVar("T")
 class PaginatedResponse(BaseModel, Generic[T]):
     """Generic paginated response wrapper."""
     items: list[T]
-    total: int
+    total: int | None = None  # Omitted in cursor mode unless explicitly requested
     page: int
     limit: int
+    next_cursor: str | None = None
     
     @property
     def pages(self) -> int:
         """Calculate total number of pages."""
+        if self.total is None:
+            return 0
         return (self.total + self.limit - 1) // self.limit if self.limit > 0 else 0
     
     @property
@@ -172,6 +175,10 @@ class PartUpdate(BaseModel):
 class PickRequest(BaseModel):
     part_number: str
 
+class PickAckRequest(BaseModel):
+    """Schema for a gateway acknowledging a pulled pick."""
+    id: str = Field(pattern=r"^\d+-\d+$")
+
 class PartResponse(BaseModel):
     """Schema for part response."""
     model_config = ConfigDict(from_attributes=True)
@@ -259,6 +266,22 @@ class ReceivingResponse(BaseModel):
     updated_at: datetime
 
 
+class ReceivingSummaryResponse(BaseModel):
+    """Schema for receiving list rows (no line items)."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    doc_number: str
+    received_by: UUID
+    received_at: datetime
+    status: str
+    notes: str | None = None
+    is_gr: bool
+    total_items: int
+    created_at: datetime
+    updated_at: datetime
+
+
 # ============================================================================
 # OUTGOING SCHEMAS
 # ============================================================================
@@ -326,6 +349,22 @@ class OutgoingResponse(BaseModel):
     updated_at: datetime
 
 
+class OutgoingSummaryResponse(BaseModel):
+    """Schema for outgoing list rows (no line items)."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    doc_number: str
+    issued_by: UUID
+    issued_at: datetime
+    status: str
+    notes: str | None = None
+    is_gi: bool
+    total_items: int
+    created_at: datetime
+    updated_at: datetime
+
+
 # ============================================================================
 # REQUEST SCHEMAS
 # ============================================================================
@@ -427,6 +466,13 @@ class PartMovementResponse(BaseModel):
     reference_id: UUID
     created_at: datetime
 
+
+class RecentMovementResponse(PartMovementResponse):
+    """Part movement with the part's number and name, for the dashboard feed."""
+    part_number: str
+    part_name: str
+
+
 class MovementSyncItem(BaseModel):
     """Simplified movement data for Google Sheets sync."""
     part_number: str
@@ -515,8 +561,8 @@ class DashboardStats(BaseModel):
 class DashboardResponse(BaseModel):
     """Complete dashboard response with stats and recent items."""
     stats: DashboardStats
-    recent_receivings: list[ReceivingResponse]
-    recent_outgoings: list[OutgoingResponse]
+    recent_receivings: list[ReceivingSummaryResponse]
+    recent_outgoings: list[OutgoingSummaryResponse]
     low_stock_parts: list[PartResponse]
     pending_requests: list[RequestResponse]
-    recent_movements: list[PartMovementResponse]
+    recent_movements: list[RecentMovementResponse]
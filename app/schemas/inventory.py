@@ -15,6 +15,7 @@ from app.schemas import (
     PartMovementResponse,
     PartResponse,
     PartUpdate,
+    PickAckRequest,
     PickRequest,
     PingResponse,
     ReceivingCreate,
@@ -49,6 +50,7 @@ __all__ = [
     "PartMovementResponse",
     "PartResponse",
     "PartUpdate",
+    "PickAckRequest",
     "PickRequest",
     "PingResponse",
     "ReceivingCreate",
@@ -32,7 +32,7 @@ REQUIRED_PACKAGES: dict[str, str] = {
     "pydantic_settings": "pydantic-settings",
     "dotenv": "python-dotenv",
     "jose": "python-jose",
-    "passlib": "passlib",
+    "argon2": "argon2-cffi",
     "cryptography": "cryptography",
     "orjson": "orjson",
 }
@@ -529,7 +529,7 @@ async def create_admin_user() -> bool:
         from app.core.security import hash_password
         from app.models import User
 
-        async with AsyncSessionLocal() as session:  # type: ignore[attr-defined]
+        async with AsyncSessionLocal() as session:
             # Check if user exists
             result = await session.execute(  # type: ignore[union-attr]
                 select(User).where(User.email == email)
@@ -0,0 +1,44 @@
+"""uuid server defaults
+
+Revision ID: 05672f55f577
+Revises: 997887fbf29e
+Create Date: 2026-10-15 23:41:12.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05672f55f577'
+down_revision: Union[str, Sequence[str], None] = '997887fbf29e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    'users',
+    'parts',
+    'receivings',
+    'receiving_items',
+    'outgoings',
+    'outgoing_items',
+    'requests',
+    'request_lists',
+    'part_movements',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # gen_random_uuid() is built in from PostgreSQL 13; pgcrypto provides it before that
+    op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('gen_random_uuid()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=None)
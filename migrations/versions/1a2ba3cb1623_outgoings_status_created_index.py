@@ -0,0 +1,31 @@
+"""outgoings status created index
+
+Revision ID: 1a2ba3cb1623
+Revises: bb235eee29ed
+Create Date: 2026-10-16 01:47:22.604193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a2ba3cb1623'
+down_revision: Union[str, Sequence[str], None] = 'bb235eee29ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_outgoings_active_status_created', 'outgoings', ['status', sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_outgoings_active_status_created', table_name='outgoings', postgresql_concurrently=True)
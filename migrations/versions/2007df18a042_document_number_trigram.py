@@ -0,0 +1,37 @@
+"""document number trigram
+
+Revision ID: 2007df18a042
+Revises: b9264ab1d246
+Create Date: 2026-10-16 02:41:36.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2007df18a042'
+down_revision: Union[str, Sequence[str], None] = 'b9264ab1d246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Serve the ILIKE '%...%' number filters on the document lists
+        op.create_index('ix_requests_request_number_trgm', 'requests', ['request_number'], unique=False, postgresql_using='gin', postgresql_ops={'request_number': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_outgoings_doc_number_trgm', 'outgoings', ['doc_number'], unique=False, postgresql_using='gin', postgresql_ops={'doc_number': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_receivings_doc_number_trgm', 'receivings', ['doc_number'], unique=False, postgresql_using='gin', postgresql_ops={'doc_number': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_receivings_doc_number_trgm', table_name='receivings', postgresql_concurrently=True)
+        op.drop_index('ix_outgoings_doc_number_trgm', table_name='outgoings', postgresql_concurrently=True)
+        op.drop_index('ix_requests_request_number_trgm', table_name='requests', postgresql_concurrently=True)
@@ -0,0 +1,47 @@
+"""drop deleted_at indexes
+
+Revision ID: 361d487b2529
+Revises: 8c77e3f4410c
+Create Date: 2026-10-15 22:45:12.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '361d487b2529'
+down_revision: Union[str, Sequence[str], None] = '8c77e3f4410c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Widen the parts index so active/stock counts can be index-only scans
+        op.create_index('ix_parts_active_stock_is_active', 'parts', ['stock', 'is_active'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_parts_active_stock', table_name='parts', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_parts_active_stock_is_active RENAME TO ix_parts_active_stock')
+
+        # Every query filters deleted_at IS NULL, which the partial indexes cover
+        op.drop_index('ix_parts_deleted_at', table_name='parts', postgresql_concurrently=True)
+        op.drop_index('ix_receivings_deleted_at', table_name='receivings', postgresql_concurrently=True)
+        op.drop_index('ix_outgoings_deleted_at', table_name='outgoings', postgresql_concurrently=True)
+        op.drop_index('ix_requests_deleted_at', table_name='requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_requests_deleted_at', 'requests', ['deleted_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_outgoings_deleted_at', 'outgoings', ['deleted_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_receivings_deleted_at', 'receivings', ['deleted_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_parts_deleted_at', 'parts', ['deleted_at'], unique=False, postgresql_concurrently=True)
+
+        op.create_index('ix_parts_active_stock_narrow', 'parts', ['stock'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_parts_active_stock', table_name='parts', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_parts_active_stock_narrow RENAME TO ix_parts_active_stock')
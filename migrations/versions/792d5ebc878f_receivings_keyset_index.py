@@ -0,0 +1,36 @@
+"""receivings keyset index
+
+Revision ID: 792d5ebc878f
+Revises: e344f78e3f31
+Create Date: 2026-10-16 03:41:27.619034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '792d5ebc878f'
+down_revision: Union[str, Sequence[str], None] = 'e344f78e3f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Add the id tiebreaker so the keyset ORDER BY and row comparison use the index
+        op.create_index('ix_receivings_active_created_id', 'receivings', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_receivings_active_created', table_name='receivings', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_receivings_active_created_id RENAME TO ix_receivings_active_created')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_receivings_active_created_narrow', 'receivings', [sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_receivings_active_created', table_name='receivings', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_receivings_active_created_narrow RENAME TO ix_receivings_active_created')
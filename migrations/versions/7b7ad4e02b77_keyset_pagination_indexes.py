@@ -0,0 +1,47 @@
+"""keyset pagination indexes
+
+Revision ID: 7b7ad4e02b77
+Revises: e9c1341df361
+Create Date: 2026-10-16 00:31:49.026518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b7ad4e02b77'
+down_revision: Union[str, Sequence[str], None] = 'e9c1341df361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # (created_at DESC, id DESC) matches the keyset ORDER BY and row comparison
+        op.create_index('ix_outgoings_active_created_id', 'outgoings', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_outgoings_active_created', table_name='outgoings', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_outgoings_active_created_id RENAME TO ix_outgoings_active_created')
+
+        op.create_index('ix_parts_active_created', 'parts', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+
+        # Movement history is always per part; the part_id prefix still serves FK lookups
+        op.create_index('ix_part_movements_part_created', 'part_movements', ['part_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_part_movements_part_id', table_name='part_movements', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_part_movements_part_id', 'part_movements', ['part_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_part_movements_part_created', table_name='part_movements', postgresql_concurrently=True)
+
+        op.drop_index('ix_parts_active_created', table_name='parts', postgresql_concurrently=True)
+
+        op.create_index('ix_outgoings_active_created_narrow', 'outgoings', [sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_outgoings_active_created', table_name='outgoings', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_outgoings_active_created_narrow RENAME TO ix_outgoings_active_created')
@@ -0,0 +1,33 @@
+"""receivings partial indexes
+
+Revision ID: 87360c87c91d
+Revises: 0c65a05f3208
+Create Date: 2026-10-15 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '87360c87c91d'
+down_revision: Union[str, Sequence[str], None] = '0c65a05f3208'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_receivings_active_created', 'receivings', [sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_receivings_active_status_gr', 'receivings', ['status', 'is_gr'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_receivings_active_status_gr', table_name='receivings', postgresql_concurrently=True)
+        op.drop_index('ix_receivings_active_created', table_name='receivings', postgresql_concurrently=True)
@@ -0,0 +1,39 @@
+"""users permissions jsonb
+
+Revision ID: 88d4b0d8cba6
+Revises: 361d487b2529
+Create Date: 2026-10-15 22:52:31.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88d4b0d8cba6'
+down_revision: Union[str, Sequence[str], None] = '361d487b2529'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('users', 'permissions',
+               existing_type=postgresql.JSON(astext_type=sa.Text()),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               postgresql_using='permissions::jsonb')
+    op.create_index('ix_users_permissions_gin', 'users', ['permissions'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_permissions_gin', table_name='users', postgresql_using='gin')
+    op.alter_column('users', 'permissions',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=postgresql.JSON(astext_type=sa.Text()),
+               existing_nullable=False,
+               postgresql_using='permissions::json')
@@ -0,0 +1,39 @@
+"""dashboard partial indexes
+
+Revision ID: 8c77e3f4410c
+Revises: 87360c87c91d
+Create Date: 2026-10-15 10:41:07.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c77e3f4410c'
+down_revision: Union[str, Sequence[str], None] = '87360c87c91d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_parts_active_stock', 'parts', ['stock'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_outgoings_active_created', 'outgoings', [sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_outgoings_active_status_gi', 'outgoings', ['status', 'is_gi'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_requests_active_created', 'requests', [sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_requests_active_status_created', 'requests', ['status', sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_requests_active_status_created', table_name='requests', postgresql_concurrently=True)
+        op.drop_index('ix_requests_active_created', table_name='requests', postgresql_concurrently=True)
+        op.drop_index('ix_outgoings_active_status_gi', table_name='outgoings', postgresql_concurrently=True)
+        op.drop_index('ix_outgoings_active_created', table_name='outgoings', postgresql_concurrently=True)
+        op.drop_index('ix_parts_active_stock', table_name='parts', postgresql_concurrently=True)
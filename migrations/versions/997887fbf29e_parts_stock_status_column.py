@@ -0,0 +1,30 @@
+"""parts stock_status column
+
+Revision ID: 997887fbf29e
+Revises: 88d4b0d8cba6
+Create Date: 2026-10-15 22:58:04.772391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '997887fbf29e'
+down_revision: Union[str, Sequence[str], None] = '88d4b0d8cba6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('parts', sa.Column('stock_status', sa.String(length=16), sa.Computed("CASE WHEN stock <= 0 THEN 'out_of_stock' WHEN stock <= 10 THEN 'low_stock' ELSE 'in_stock' END", persisted=True), nullable=False))
+    op.create_index('ix_parts_stock_status', 'parts', ['stock_status', 'stock'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parts_stock_status', table_name='parts', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.drop_column('parts', 'stock_status')
@@ -0,0 +1,44 @@
+"""requests keyset indexes
+
+Revision ID: b9264ab1d246
+Revises: 1a2ba3cb1623
+Create Date: 2026-10-16 02:14:05.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9264ab1d246'
+down_revision: Union[str, Sequence[str], None] = '1a2ba3cb1623'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Add the id tiebreaker so the keyset ORDER BY and row comparison use the index
+        op.create_index('ix_requests_active_created_id', 'requests', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_requests_active_created', table_name='requests', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_requests_active_created_id RENAME TO ix_requests_active_created')
+
+        op.create_index('ix_requests_active_status_created_id', 'requests', ['status', sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_requests_active_status_created', table_name='requests', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_requests_active_status_created_id RENAME TO ix_requests_active_status_created')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_requests_active_status_created_narrow', 'requests', ['status', sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_requests_active_status_created', table_name='requests', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_requests_active_status_created_narrow RENAME TO ix_requests_active_status_created')
+
+        op.create_index('ix_requests_active_created_narrow', 'requests', [sa.text('created_at DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_requests_active_created', table_name='requests', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_requests_active_created_narrow RENAME TO ix_requests_active_created')
@@ -0,0 +1,31 @@
+"""parts search trigram
+
+Revision ID: bb235eee29ed
+Revises: 7b7ad4e02b77
+Create Date: 2026-10-16 01:12:07.318455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb235eee29ed'
+down_revision: Union[str, Sequence[str], None] = '7b7ad4e02b77'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('parts', sa.Column('search_text', sa.Text(), sa.Computed("part_number || ' | ' || part_name || ' | ' || coalesce(customer_code, '') || ' | ' || coalesce(supplier_code, '') || ' | ' || coalesce(model, '')", persisted=True), nullable=False))
+    op.create_index('ix_parts_search_trgm', 'parts', ['search_text'], unique=False, postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parts_search_trgm', table_name='parts', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+    op.drop_column('parts', 'search_text')
@@ -0,0 +1,29 @@
+"""part movements clock timestamp
+
+Revision ID: e344f78e3f31
+Revises: 2007df18a042
+Create Date: 2026-10-16 03:05:52.774019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e344f78e3f31'
+down_revision: Union[str, Sequence[str], None] = '2007df18a042'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() is the transaction start; clock_timestamp() advances per row
+    op.alter_column('part_movements', 'created_at', server_default=sa.text("(clock_timestamp() AT TIME ZONE 'Asia/Jakarta')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('part_movements', 'created_at', server_default=sa.text("(now() AT TIME ZONE 'Asia/Jakarta')"))
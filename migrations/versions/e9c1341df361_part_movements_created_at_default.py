@@ -0,0 +1,28 @@
+"""part_movements created_at default
+
+Revision ID: e9c1341df361
+Revises: 05672f55f577
+Create Date: 2026-10-15 23:58:37.140962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c1341df361'
+down_revision: Union[str, Sequence[str], None] = '05672f55f577'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('part_movements', 'created_at', server_default=sa.text("(now() AT TIME ZONE 'Asia/Jakarta')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('part_movements', 'created_at', server_default=None)
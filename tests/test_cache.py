@@ -0,0 +1,151 @@
+"""Tests for the in-process caches in app.core.cache."""
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.core import cache
+from app.core.cache import TTLLRUCache, invalidate_on_commit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.monotonic_ns as seen by the cache; advance with clock.advance(seconds)."""
+
+    class Clock:
+        now = 1_000_000_000_000
+
+        def advance(self, seconds: float) -> None:
+            self.now += int(seconds * 1_000_000_000)
+
+    fake = Clock()
+    monkeypatch.setattr(cache.time, "monotonic_ns", lambda: fake.now)
+    return fake
+
+
+def test_entry_expires_after_ttl(clock):
+    c: TTLLRUCache[str, int] = TTLLRUCache(maxsize=4, ttl_seconds=10.0)
+    c.set("a", 1)
+
+    clock.advance(9.999)
+    assert c.get("a") == 1
+
+    clock.advance(0.001)
+    assert c.get("a") is None
+    assert len(c) == 0
+
+
+def test_per_entry_ttl_only_shortens(clock):
+    c: TTLLRUCache[str, int] = TTLLRUCache(maxsize=4, ttl_seconds=10.0)
+    c.set("short", 1, ttl_seconds=2.0)
+    c.set("long", 2, ttl_seconds=60.0)
+
+    clock.advance(2.0)
+    assert c.get("short") is None
+    assert c.get("long") == 2
+
+    clock.advance(8.0)
+    assert c.get("long") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    c: TTLLRUCache[str, int] = TTLLRUCache(maxsize=2, ttl_seconds=10.0)
+    c.set("a", 1)
+    c.set("b", 2)
+    # Reading "a" makes "b" the least recently used
+    assert c.get("a") == 1
+
+    c.set("c", 3)
+
+    assert (c.get("a"), c.get("b"), c.get("c")) == (1, None, 3)
+    assert len(c) == 2
+
+
+def test_set_refreshes_an_existing_entry(clock):
+    c: TTLLRUCache[str, int] = TTLLRUCache(maxsize=2, ttl_seconds=10.0)
+    c.set("a", 1)
+    c.set("b", 2)
+    clock.advance(5.0)
+
+    c.set("a", 10)
+    c.set("c", 3)
+    clock.advance(6.0)
+
+    assert (c.get("a"), c.get("b"), c.get("c")) == (10, None, 3)
+
+
+def test_pop_and_clear(clock):
+    c: TTLLRUCache[str, int] = TTLLRUCache(maxsize=4, ttl_seconds=10.0)
+    c.set("a", 1)
+    c.set("b", 2)
+
+    c.pop("a")
+    c.pop("missing")
+    assert (c.get("a"), c.get("b")) == (None, 2)
+
+    c.clear()
+    assert len(c) == 0
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Tracked(_Base):
+    __tablename__ = "tracked"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+class _Untracked(_Base):
+    __tablename__ = "untracked"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+_invalidations: list[str] = []
+invalidate_on_commit((_Tracked,), lambda: _invalidations.append("tracked"), "test_tracked_dirty")
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(_Tracked(id=1, name="seed"))
+        session.commit()
+        _invalidations.clear()
+        yield session
+    engine.dispose()
+
+
+def test_flushed_write_invalidates_after_commit(session):
+    session.add(_Tracked(id=2, name="new"))
+    session.flush()
+    assert _invalidations == []
+
+    session.commit()
+    assert _invalidations == ["tracked"]
+
+
+def test_bulk_statement_invalidates_after_commit(session):
+    # UPDATE ... RETURNING style writes never pass through a flush
+    session.execute(update(_Tracked).where(_Tracked.id == 1).values(name="renamed"))
+    session.commit()
+
+    assert _invalidations == ["tracked"]
+
+
+def test_rolled_back_write_does_not_invalidate(session):
+    session.execute(update(_Tracked).values(name="renamed"))
+    session.rollback()
+    session.commit()
+
+    assert _invalidations == []
+
+
+def test_other_models_and_reads_do_not_invalidate(session):
+    session.add(_Untracked(id=1))
+    session.execute(select(_Tracked))
+    session.commit()
+
+    assert _invalidations == []
@@ -0,0 +1,46 @@
+"""Tests for is_cloudflare_ip's integer netmask tables."""
+
+from ipaddress import ip_address, ip_network
+
+import pytest
+
+from app.main import CLOUDFLARE_IPV4, CLOUDFLARE_IPV6, is_cloudflare_ip
+
+
+_NETWORKS = [ip_network(cidr) for cidr in CLOUDFLARE_IPV4 + CLOUDFLARE_IPV6]
+
+
+def _reference(ip: str) -> bool:
+    """What the stdlib says (slow: a containment test per range)."""
+    addr = ip_address(ip)
+    return any(addr in net for net in _NETWORKS)
+
+
+@pytest.mark.parametrize("net", _NETWORKS, ids=str)
+def test_range_edges_and_neighbours_agree_with_ipaddress(net):
+    assert is_cloudflare_ip(str(net.network_address))
+    assert is_cloudflare_ip(str(net.broadcast_address))
+    # Just outside the range; adjacent ranges (104.16/13, 104.24/14) still match
+    for neighbour in (net.network_address - 1, net.broadcast_address + 1):
+        assert is_cloudflare_ip(str(neighbour)) == _reference(str(neighbour))
+
+
+@pytest.mark.parametrize(
+    "ip",
+    [
+        "127.0.0.1", "10.0.0.1", "8.8.8.8", "0.0.0.0", "255.255.255.255",
+        "::1", "2001:db8::1", "2400:cb01::",
+    ],
+)
+def test_other_addresses_do_not_match(ip):
+    assert not is_cloudflare_ip(ip)
+
+
+def test_ipv6_notation_does_not_matter():
+    assert is_cloudflare_ip("2606:4700:0:0:0:0:0:1")
+    assert is_cloudflare_ip("2606:4700::1")
+
+
+@pytest.mark.parametrize("ip", ["", "not-an-ip", "104.16.0.256", "1.2.3.4/32"])
+def test_invalid_addresses_are_rejected(ip):
+    assert not is_cloudflare_ip(ip)
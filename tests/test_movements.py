@@ -0,0 +1,60 @@
+"""Database tests for movement date filters (needs TEST_DATABASE_URL)."""
+
+from datetime import date, datetime
+from uuid import uuid4
+
+import orjson
+import pytest
+import pytest_asyncio
+
+from app.api.v1.inventory.movements import get_movements
+from app.models import Part, PartMovement
+
+pytestmark = pytest.mark.asyncio
+
+_EDGES = {
+    "day_before": datetime(2026, 3, 9, 23, 59, 59, 999999),
+    "start": datetime(2026, 3, 10, 0, 0),
+    "end": datetime(2026, 3, 12, 23, 59, 59, 999999),
+    "day_after": datetime(2026, 3, 13, 0, 0),
+}
+
+
+@pytest_asyncio.fixture
+async def movements(db) -> dict[str, str]:
+    """One movement per edge timestamp, keyed by edge name → movement id."""
+    part = Part(part_number="P-0", part_name="Part 0", stock=0)
+    rows = {
+        name: PartMovement(
+            part=part, stock_before=0, type="in", qty=1, stock_after=1,
+            reference_type="Receivings", reference_id=uuid4(), created_at=created_at,
+        )
+        for name, created_at in _EDGES.items()
+    }
+    db.add_all([part, *rows.values()])
+    await db.commit()
+    return {name: str(row.id) for name, row in rows.items()}
+
+
+async def _ids(db, **filters) -> set[str]:
+    response = await get_movements(db, current_user=None, page=1, limit=100, part_id=None, movement_type=None,
+                                   reference_type=None, cursor=None, exact_count=False, **filters)
+    body = orjson.loads(response.body)
+    assert body["total"] == len(body["items"])
+    return {item["id"] for item in body["items"]}
+
+
+@pytest.mark.parametrize(
+    ("start_date", "end_date", "expected"),
+    [
+        (date(2026, 3, 10), date(2026, 3, 12), {"start", "end"}),
+        (date(2026, 3, 10), None, {"start", "end", "day_after"}),
+        (None, date(2026, 3, 12), {"day_before", "start", "end"}),
+        (date(2026, 3, 13), date(2026, 3, 13), {"day_after"}),
+        (date(2026, 3, 11), date(2026, 3, 11), set()),
+    ],
+)
+async def test_date_bounds_are_whole_days(db, movements, start_date, end_date, expected):
+    ids = await _ids(db, start_date=start_date, end_date=end_date)
+
+    assert ids == {movements[name] for name in expected}
@@ -0,0 +1,131 @@
+"""Database tests for outgoing status transitions (needs TEST_DATABASE_URL)."""
+
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.v1.inventory.outgoings import cancel_outgoing, complete_outgoing
+from app.models import Outgoing, OutgoingItem, Part, PartMovement, User
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _seed(db, stocks: list[int], lines: list[tuple[int, int]]) -> tuple[UUID, list[UUID]]:
+    """A draft outgoing with (part index, qty) lines over parts with the given stock."""
+    user = User(name="Tester", email=f"{uuid4()}@example.com", password="x")
+    parts = [Part(part_number=f"P-{i}", part_name=f"Part {i}", stock=stock) for i, stock in enumerate(stocks)]
+    outgoing = Outgoing(
+        doc_number=f"OUT-{uuid4()}",
+        issued_by_user=user,
+        items=[OutgoingItem(part=parts[index], qty=qty) for index, qty in lines],
+    )
+    db.add_all([user, *parts, outgoing])
+    await db.commit()
+    return outgoing.id, [part.id for part in parts]
+
+
+async def _stocks(session_factory, part_ids: list[UUID]) -> list[int]:
+    async with session_factory() as db:
+        stock = dict((await db.execute(select(Part.id, Part.stock).where(Part.id.in_(part_ids)))).tuples().all())
+    return [stock[part_id] for part_id in part_ids]
+
+
+async def _status(session_factory, outgoing_id: UUID) -> str:
+    async with session_factory() as db:
+        return await db.scalar(select(Outgoing.status).where(Outgoing.id == outgoing_id))
+
+
+async def _complete(db, outgoing_id: UUID):
+    """Complete as the route would, rolling back on error like get_db's session exit."""
+    try:
+        return await complete_outgoing(outgoing_id, db, current_user=None)
+    except HTTPException:
+        await db.rollback()
+        raise
+
+
+async def test_complete_issues_stock_and_chains_movements(db, session_factory):
+    outgoing_id, part_ids = await _seed(db, stocks=[10, 4], lines=[(0, 3), (1, 4), (0, 2)])
+
+    response = await _complete(db, outgoing_id)
+
+    assert response.status == "completed"
+    assert await _stocks(session_factory, part_ids) == [5, 0]
+    async with session_factory() as check:
+        movements = (await check.execute(
+            select(PartMovement.part_id, PartMovement.stock_before, PartMovement.stock_after, PartMovement.type)
+            .where(PartMovement.reference_id == outgoing_id)
+        )).all()
+    assert sorted((part_ids.index(m.part_id), m.stock_before, m.stock_after, m.type) for m in movements) == [
+        (0, 7, 5, "out"), (0, 10, 7, "out"), (1, 4, 0, "out"),
+    ]
+
+
+async def test_shortfall_is_a_409_and_changes_nothing(db, session_factory):
+    # Part 0 has enough for either line alone but not for both
+    outgoing_id, part_ids = await _seed(db, stocks=[4, 9], lines=[(0, 3), (1, 1), (0, 2)])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, outgoing_id)
+
+    assert exc_info.value.status_code == 409
+    assert "P-0" in exc_info.value.detail
+    assert await _status(session_factory, outgoing_id) == "draft"
+    assert await _stocks(session_factory, part_ids) == [4, 9]
+
+
+async def test_second_complete_is_a_409(db, session_factory):
+    outgoing_id, part_ids = await _seed(db, stocks=[10], lines=[(0, 3)])
+    await _complete(db, outgoing_id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, outgoing_id)
+
+    assert exc_info.value.status_code == 409
+    assert await _stocks(session_factory, part_ids) == [7]
+
+
+async def test_concurrent_completes_issue_stock_once(db, session_factory):
+    outgoing_id, part_ids = await _seed(db, stocks=[10], lines=[(0, 3)])
+
+    async def attempt() -> int:
+        async with session_factory() as session:
+            try:
+                await _complete(session, outgoing_id)
+            except HTTPException as exc:
+                return exc.status_code
+            return 200
+
+    assert sorted(await asyncio.gather(attempt(), attempt())) == [200, 409]
+    assert await _stocks(session_factory, part_ids) == [7]
+
+
+async def test_complete_unknown_outgoing_is_a_404(db):
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, uuid4())
+
+    assert exc_info.value.status_code == 404
+
+
+async def test_cancelled_outgoing_cannot_be_completed(db, session_factory):
+    outgoing_id, part_ids = await _seed(db, stocks=[10], lines=[(0, 3)])
+
+    response = await cancel_outgoing(outgoing_id, db, current_user=None)
+    assert response.status == "cancelled"
+    assert len(response.items) == 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, outgoing_id)
+
+    assert exc_info.value.status_code == 409
+    assert await _stocks(session_factory, part_ids) == [10]
+
+
+async def test_cancel_unknown_outgoing_is_a_404(db):
+    with pytest.raises(HTTPException) as exc_info:
+        await cancel_outgoing(uuid4(), db, current_user=None)
+
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,92 @@
+"""Tests for keyset cursors and page helpers in app.core.pagination."""
+
+from collections import namedtuple
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor, fetch_page_with_total, page_response
+from app.schemas import PaginatedResponse
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    [
+        datetime(2026, 1, 31, 23, 59, 59, 999999),
+        datetime(2026, 1, 1, 7, 0, tzinfo=timezone.utc),
+    ],
+    ids=["naive", "aware"],
+)
+def test_cursor_round_trip(created_at):
+    row_id = uuid4()
+
+    cursor = encode_cursor(created_at, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bm8tc2VwYXJhdG9y", encode_cursor(datetime(2026, 1, 1), uuid4())[:-4]])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+
+
+# Page rows carry the entity first and the window total as `total`
+Row = namedtuple("Row", ["entity", "total"])
+
+
+def _db(rows, count=None):
+    """A session whose execute() returns `rows`, then `count` for a count query."""
+    page_result = MagicMock()
+    page_result.all.return_value = rows
+    count_result = MagicMock()
+    count_result.scalar_one.return_value = count
+    return AsyncMock(execute=AsyncMock(side_effect=[page_result, count_result]))
+
+
+def _stmt():
+    stmt = MagicMock()
+    stmt.add_columns.return_value.offset.return_value = "page"
+    return stmt
+
+
+@pytest.mark.asyncio
+async def test_total_rides_along_on_the_page():
+    db = _db([Row("a", 7), Row("b", 7)])
+
+    items, total = await fetch_page_with_total(db, _stmt(), MagicMock(), offset=0)
+
+    assert (items, total) == (["a", "b"], 7)
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_first_page_skips_the_count():
+    db = _db([])
+
+    assert await fetch_page_with_total(db, _stmt(), MagicMock(), offset=0) == ([], 0)
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_page_past_the_end_falls_back_to_count():
+    db = _db([], count=12)
+
+    assert await fetch_page_with_total(db, _stmt(), "count", offset=40) == ([], 12)
+    assert db.execute.await_args_list[1].args == ("count",)
+
+
+def test_page_response_sends_the_dumped_model():
+    page = PaginatedResponse[int](items=[1, 2], total=2, page=1, limit=20)
+
+    response = page_response(page)
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == orjson.loads(page.model_dump_json())
@@ -0,0 +1,81 @@
+"""Tests for part ETags and conditional GETs (If-None-Match → 304)."""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.api.v1.inventory import parts
+
+PART_ID = uuid4()
+
+
+def _part(stock: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=PART_ID, part_number="P-001", part_name="Bracket", customer_code=None,
+        supplier_code=None, model=None, variant=None, standard_packing=10, stock=stock,
+        address=None, is_active=True, stock_status="in_stock",
+        created_at=datetime(2026, 1, 1), updated_at=datetime(2026, 1, 1),
+    )
+
+
+def _db(part) -> AsyncMock:
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = part
+    return AsyncMock(execute=AsyncMock(return_value=result))
+
+
+@pytest.fixture(autouse=True)
+def _empty_caches():
+    parts.invalidate_parts_cache()
+    yield
+    parts.invalidate_parts_cache()
+
+
+async def _get(db, if_none_match=None):
+    return await parts.get_part(PART_ID, db, current_user=None, if_none_match=if_none_match)
+
+
+@pytest.mark.asyncio
+async def test_get_sends_a_weak_etag():
+    response = await _get(_db(_part(stock=5)))
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert b'"stock":5' in response.body
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("header", ["{etag}", 'W/"other", {etag}', "*"])
+async def test_matching_if_none_match_is_a_304_from_cache(header):
+    db = _db(_part(stock=5))
+    etag = (await _get(db)).headers["ETag"]
+
+    response = await _get(db, if_none_match=header.format(etag=etag))
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.body == b""
+    # The second request is answered from the rendered-body cache
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_etag_gets_the_full_body():
+    response = await _get(_db(_part(stock=5)), if_none_match='W/"stale"')
+
+    assert response.status_code == 200
+    assert response.body
+
+
+@pytest.mark.asyncio
+async def test_etag_changes_with_stock_after_invalidation():
+    etag = (await _get(_db(_part(stock=5)))).headers["ETag"]
+    parts.invalidate_parts_cache()
+
+    response = await _get(_db(_part(stock=4)), if_none_match=etag)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,87 @@
+"""Tests for the parts pick queue (Redis stream with a consumer group)."""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.api.v1.inventory import parts  # noqa: E402
+
+
+class Redis62(fakeredis.FakeAsyncRedis):
+    """
+    fakeredis drops trimmed entries on XAUTOCLAIM like Redis 7; Redis 6.2
+    keeps them pending and still names them in a JUSTID reply.
+    """
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None, justid=False):
+        assert justid, "a plain claim of a trimmed pick replies with a nil entry on Redis 6.2"
+        pending = await self.xpending_range(name, groupname, min="-", max="+", count=count or 100)
+        return [entry["message_id"] for entry in pending if entry["time_since_delivered"] >= min_idle_time]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(parts, "redis_client", client)
+    monkeypatch.setattr(parts, "_pick_group_ready", False)
+    # XREADGROUP BLOCK takes whole milliseconds; an empty pull waits a second
+    monkeypatch.setattr(parts, "QUEUE_POLL_TIMEOUT", 1)
+    # Every pending pick counts as stale
+    monkeypatch.setattr(parts, "QUEUE_ACK_TIMEOUT", 0)
+    return client
+
+
+async def _pick(part_number: str) -> str:
+    return await parts.redis_client.xadd(parts.QUEUE_KEY, {"part_number": part_number})
+
+
+@pytest.mark.asyncio
+async def test_pull_without_ack_is_final(redis):
+    await _pick("P-1")
+
+    pick_id, fields = await parts._pull_pick("gw", ack=False)
+
+    assert fields == {"part_number": "P-1"}
+    assert (await redis.xpending(parts.QUEUE_KEY, parts.QUEUE_GROUP))["pending"] == 0
+    assert await parts._pull_pick("gw", ack=False) is None
+
+
+@pytest.mark.asyncio
+async def test_unacked_pick_is_redelivered(redis):
+    pick_id = await _pick("P-1")
+
+    assert (await parts._pull_pick("gw-1", ack=True))[0] == pick_id
+    # Not acknowledged within QUEUE_ACK_TIMEOUT (0 here): handed out again
+    assert (await parts._pull_pick("gw-2", ack=True))[0] == pick_id
+
+    await redis.xack(parts.QUEUE_KEY, parts.QUEUE_GROUP, pick_id)
+    assert await parts._pull_pick("gw-2", ack=True) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client_class", [fakeredis.FakeAsyncRedis, Redis62], ids=["redis7", "redis6.2"])
+async def test_pick_trimmed_while_pending_is_skipped_and_acked(monkeypatch, redis, client_class):
+    client = client_class(decode_responses=True)
+    monkeypatch.setattr(parts, "redis_client", client)
+    stale_id = await _pick("P-1")
+    assert (await parts._pull_pick("gw-1", ack=True))[0] == stale_id
+    fresh_id = await _pick("P-2")
+    # Day-old picks are trimmed by MINID; here the stale one goes while pending
+    await client.xtrim(parts.QUEUE_KEY, minid=fresh_id, approximate=False)
+
+    pick_id, fields = await parts._pull_pick("gw-2", ack=True)
+
+    assert (pick_id, fields) == (fresh_id, {"part_number": "P-2"})
+    pending = await client.xpending_range(parts.QUEUE_KEY, parts.QUEUE_GROUP, min="-", max="+", count=10)
+    assert [entry["message_id"] for entry in pending] == [fresh_id]
+
+
+@pytest.mark.asyncio
+async def test_legacy_list_is_drained_in_order(redis):
+    await redis.rpush(parts.LEGACY_QUEUE_KEY, "OLD-1", "OLD-2")
+
+    first = await parts._pull_pick("gw", ack=False)
+    second = await parts._pull_pick("gw", ack=False)
+
+    assert [first[1]["part_number"], second[1]["part_number"]] == ["OLD-1", "OLD-2"]
+    assert await redis.exists(parts.LEGACY_QUEUE_KEY) == 0
@@ -0,0 +1,135 @@
+"""Database tests for receiving status transitions (needs TEST_DATABASE_URL)."""
+
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.v1.inventory.receivings import cancel_receiving, complete_receiving
+from app.core.config import now_jakarta
+from app.models import Part, PartMovement, Receiving, ReceivingItem, User
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _seed(db, stocks: list[int], lines: list[tuple[int, int]], status: str = "draft") -> tuple[UUID, list[UUID]]:
+    """A receiving with (part index, qty) lines over parts with the given stock."""
+    user = User(name="Tester", email=f"{uuid4()}@example.com", password="x")
+    parts = [Part(part_number=f"P-{i}", part_name=f"Part {i}", stock=stock) for i, stock in enumerate(stocks)]
+    receiving = Receiving(
+        doc_number=f"RCV-{uuid4()}",
+        received_by_user=user,
+        status=status,
+        items=[ReceivingItem(part=parts[index], qty=qty) for index, qty in lines],
+    )
+    db.add_all([user, *parts, receiving])
+    await db.commit()
+    return receiving.id, [part.id for part in parts]
+
+
+async def _stocks(session_factory, part_ids: list[UUID]) -> list[int]:
+    async with session_factory() as db:
+        stock = dict((await db.execute(select(Part.id, Part.stock).where(Part.id.in_(part_ids)))).tuples().all())
+    return [stock[part_id] for part_id in part_ids]
+
+
+async def _status(session_factory, receiving_id: UUID) -> str:
+    async with session_factory() as db:
+        return await db.scalar(select(Receiving.status).where(Receiving.id == receiving_id))
+
+
+async def _complete(db, receiving_id: UUID):
+    """Complete as the route would, rolling back on error like get_db's session exit."""
+    try:
+        return await complete_receiving(receiving_id, db, current_user=None)
+    except HTTPException:
+        await db.rollback()
+        raise
+
+
+async def test_complete_adds_stock_and_chains_movements(db, session_factory):
+    receiving_id, part_ids = await _seed(db, stocks=[5, 0], lines=[(0, 3), (1, 4), (0, 2)])
+
+    response = await _complete(db, receiving_id)
+
+    assert response.status == "completed"
+    assert await _stocks(session_factory, part_ids) == [10, 4]
+    async with session_factory() as check:
+        movements = (await check.execute(
+            select(PartMovement.part_id, PartMovement.stock_before, PartMovement.stock_after, PartMovement.type)
+            .where(PartMovement.reference_id == receiving_id)
+        )).all()
+    assert sorted((part_ids.index(m.part_id), m.stock_before, m.stock_after, m.type) for m in movements) == [
+        (0, 5, 8, "in"), (0, 8, 10, "in"), (1, 0, 4, "in"),
+    ]
+
+
+async def test_second_complete_is_a_409(db, session_factory):
+    receiving_id, part_ids = await _seed(db, stocks=[5], lines=[(0, 3)])
+    await _complete(db, receiving_id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, receiving_id)
+
+    assert exc_info.value.status_code == 409
+    assert await _stocks(session_factory, part_ids) == [8]
+
+
+async def test_concurrent_completes_add_stock_once(db, session_factory):
+    receiving_id, part_ids = await _seed(db, stocks=[5], lines=[(0, 3)])
+
+    async def attempt() -> int:
+        async with session_factory() as session:
+            try:
+                await _complete(session, receiving_id)
+            except HTTPException as exc:
+                return exc.status_code
+            return 200
+
+    assert sorted(await asyncio.gather(attempt(), attempt())) == [200, 409]
+    assert await _stocks(session_factory, part_ids) == [8]
+
+
+async def test_complete_with_deleted_part_is_a_409_and_keeps_the_draft(db, session_factory):
+    receiving_id, part_ids = await _seed(db, stocks=[5, 1], lines=[(0, 3), (1, 1)])
+    part = await db.get(Part, part_ids[1])
+    part.deleted_at = now_jakarta()
+    await db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, receiving_id)
+
+    assert exc_info.value.status_code == 409
+    assert str(part_ids[1]) in exc_info.value.detail
+    assert await _status(session_factory, receiving_id) == "draft"
+    assert await _stocks(session_factory, part_ids) == [5, 1]
+
+
+async def test_complete_unknown_receiving_is_a_404(db):
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, uuid4())
+
+    assert exc_info.value.status_code == 404
+
+
+async def test_cancelled_receiving_cannot_be_completed(db, session_factory):
+    receiving_id, part_ids = await _seed(db, stocks=[5], lines=[(0, 3)])
+
+    response = await cancel_receiving(receiving_id, db, current_user=None)
+    assert response.status == "cancelled"
+    assert len(response.items) == 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _complete(db, receiving_id)
+
+    assert exc_info.value.status_code == 409
+    assert await _stocks(session_factory, part_ids) == [5]
+
+
+async def test_cancel_unknown_receiving_is_a_404(db):
+    with pytest.raises(HTTPException) as exc_info:
+        await cancel_receiving(uuid4(), db, current_user=None)
+
+    assert exc_info.value.status_code == 404